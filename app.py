@@ -5,7 +5,8 @@ import datetime
 import threading
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QLineEdit, QListWidget, QMessageBox
 from PyQt5.QtCore import QTimer
-from PyQt5.QtGui import QImage, QPixmap
+from stream_supervisor import StreamSupervisor
+from frame_renderer import FrameRenderer
 import os
 os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "rtsp_transport;tcp|timeout;5000000"
 
@@ -19,6 +20,9 @@ class StreamApp(QWidget):
         self.load_saved_urls()
         self.timer = QTimer(self)
         self.timer.start(1000)  # Check every second
+        self.display_fps = 25  # Display refresh cap
+        self.renderer = FrameRenderer(self.video_label, self.display_fps, parent=self)
+        self.supervisors = []
         
     def init_db(self):
         self.conn = sqlite3.connect("streams.db")
@@ -90,25 +94,22 @@ class StreamApp(QWidget):
             threading.Thread(target=self.display_stream, args=(url,), daemon=True).start()
     
     def display_stream(self, url):
-        cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG)
-        if not cap.isOpened():
-            print("Không thể mở stream:", url)
-
-        while cap.isOpened():
-            ret, frame = cap.read()
+        # Reconnects with backoff when the stream fails or stalls instead of giving up
+        supervisor = StreamSupervisor(url, opener=lambda url: cv2.VideoCapture(url, cv2.CAP_FFMPEG),
+                                      on_state=lambda state: print(f"Stream {url}: {state}"))
+        self.supervisors.append(supervisor.start())
+        while supervisor.is_running():
+            ret, frame = supervisor.read(timeout=1.0)
             if ret:
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = frame.shape
-                bytes_per_line = ch * w
-                qimg = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-                pixmap = QPixmap.fromImage(qimg)
-                self.video_label.setPixmap(pixmap)
-            else:
-                break
-        cap.release()
+                # Frames go to the GUI thread through a Qt signal, at most display_fps per second
+                if self.renderer.ready():
+                    self.renderer.submit(frame)
+        supervisor.stop()
     
         
     def closeEvent(self, event):
+        for supervisor in self.supervisors:
+            supervisor.stop()
         self.conn.close()
         event.accept()
         
@@ -0,0 +1,167 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from inference_server import LABELS
+from stream_engine import MODEL_PATH
+
+OUTPUT_DIR = "batch_output"
+FEATURE_COLUMNS = [f"lm{i}_{axis}" for i in range(33) for axis in ("x", "y", "z", "v")]
+
+
+def video_info(path):
+    """Return ``(frame_count, fps)`` as reported by the container."""
+    import cv2
+
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            raise RuntimeError(f"Cannot open {path}")
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS) or 30.0
+    finally:
+        cap.release()
+
+
+def plan_chunks(paths, workers, chunk_seconds=None):
+    """Split ``paths`` into ``(path, start, stop)`` frame ranges for the worker pool.
+
+    With ``chunk_seconds`` every file is cut into chunks of that length;
+    otherwise files are only split when there are fewer of them than
+    workers, so a single long video still uses every core. ``stop`` is None
+    for the last chunk of a file, which is read until the decoder ends
+    (container frame counts are not always exact).
+    """
+    chunks = []
+    for path in paths:
+        count, fps = video_info(path)
+        if chunk_seconds:
+            size = max(1, int(chunk_seconds * fps))
+        else:
+            size = -(-count // max(1, workers // len(paths))) if count else 0
+        if not size or size >= count:
+            chunks.append((path, 0, None))
+            continue
+        starts = list(range(0, count, size))
+        chunks += [(path, start, start + size) for start in starts[:-1]] + [(path, starts[-1], None)]
+    return chunks
+
+
+def classify_frames(model, landmarks, detected, no_of_timesteps=100, stride=1, scaler=None, batch_size=256):
+    """Window the detected frames like ``LandmarkWindow`` does live and classify them in batches.
+
+    Frames without a pose are skipped, as in the stream loop, and each
+    window's result is assigned to its last frame. Returns per-frame
+    ``(label_index, confidence)`` arrays with -1 / NaN where no window ended.
+    """
+    from ml_pipeline.windowing import window_view
+
+    label_index = np.full(len(landmarks), -1, dtype=np.int64)
+    confidence = np.full(len(landmarks), np.nan, dtype=np.float32)
+    frames = np.flatnonzero(detected)
+    windows = window_view(landmarks[frames], no_of_timesteps, stride)
+    ends = frames[no_of_timesteps - 1::stride][:len(windows)]
+    for i in range(0, len(windows), batch_size):
+        batch = np.ascontiguousarray(windows[i:i + batch_size], dtype=np.float32)
+        if scaler is not None:
+            batch = scaler.transform(batch)
+        prediction = model.predict(batch)
+        label_index[ends[i:i + batch_size]] = prediction.argmax(axis=-1)
+        confidence[ends[i:i + batch_size]] = prediction.max(axis=-1)
+    return label_index, confidence
+
+
+def write_output(path, landmarks, detected, label_index, confidence, fps, output_format="parquet"):
+    """Write one row per frame with its landmarks and windowed label to a columnar file."""
+    import pandas as pd
+
+    frame = pd.DataFrame(landmarks, columns=FEATURE_COLUMNS)
+    frame.insert(0, "frame", np.arange(len(landmarks), dtype=np.int64))
+    frame.insert(1, "time_s", frame["frame"] / fps)
+    frame.insert(2, "pose", detected)
+    frame["label"] = pd.Categorical.from_codes(label_index, LABELS)
+    frame["confidence"] = confidence
+    if output_format == "parquet":
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_feather(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run pose estimation and the LSTM over recorded videos, offline")
+    parser.add_argument("videos", nargs="+", help="video files, e.g. video/loitering_people.mp4")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--format", choices=["parquet", "feather"], default="parquet")
+    parser.add_argument("--workers", type=int, default=None, help="pose worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-seconds", type=float, default=None,
+                        help="split every video into chunks of this length (default: split only to fill the workers)")
+    parser.add_argument("--inference-width", type=int, default=640,
+                        help="downscale frames wider than this before pose estimation")
+    parser.add_argument("--model", default=MODEL_PATH, help=".h5/.keras, .tflite or .onnx model")
+    parser.add_argument("--backend", choices=["keras", "tflite", "onnx"], default=None)
+    parser.add_argument("--scaler", default=None, help="feature scaler the model was trained with")
+    parser.add_argument("--timesteps", type=int, default=100, help="landmark window length")
+    parser.add_argument("--stride", type=int, default=1, help="classify every k-th window")
+    parser.add_argument("--cache-dir", default=None, help="landmark cache directory (default: POSE_LANDMARK_CACHE)")
+    parser.add_argument("--no-cache", action="store_true", help="always run pose estimation")
+    args = parser.parse_args(argv)
+
+    import model_cache
+    from ml_pipeline.features import extract_video, load_scaler
+    from ml_pipeline.landmark_cache import CACHE_DIR, LandmarkCache
+
+    workers = args.workers or os.cpu_count() or 1
+    os.makedirs(args.output_dir, exist_ok=True)
+    started = time.perf_counter()
+    fps = {path: video_info(path)[1] for path in args.videos}
+    # Videos seen before with the same pose settings skip pose estimation entirely
+    cache = None if args.no_cache else LandmarkCache(args.cache_dir or CACHE_DIR)
+    keys, cached = {}, {}
+    if cache is not None:
+        for path in args.videos:
+            keys[path] = cache.key(path, inference_width=args.inference_width)
+            hit = cache.get(keys[path])
+            if hit is not None:
+                cached[path] = hit
+                print(f"{path}: landmarks from cache")
+    pending = [path for path in args.videos if path not in cached]
+    chunks = plan_chunks(pending, workers, args.chunk_seconds) if pending else []
+    parts = {path: {} for path in pending}
+    # Pose estimation, the expensive part, runs in parallel; the LSTM runs batched in this process
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(extract_video, path, start, stop, args.inference_width): (path, start)
+                   for path, start, stop in chunks}
+        for done, future in enumerate(as_completed(futures), 1):
+            path, start = futures[future]
+            parts[path][start] = future.result()
+            print(f"[{done}/{len(chunks)}] {path} from frame {start}: {len(parts[path][start][0])} frames")
+
+    model = model_cache.get_model(args.model, args.backend, warm_up_shape=None)
+    scaler = load_scaler(args.scaler)
+    total = 0
+    for path in args.videos:
+        if path in cached:
+            landmarks, detected = cached[path]
+        else:
+            ordered = [parts[path][start] for start in sorted(parts[path])]
+            landmarks = np.concatenate([landmarks for landmarks, _ in ordered])
+            detected = np.concatenate([detected for _, detected in ordered])
+            if cache is not None:
+                cache.put(keys[path], landmarks, detected)
+        label_index, confidence = classify_frames(model, landmarks, detected, args.timesteps, args.stride, scaler)
+        output_path = os.path.join(args.output_dir, os.path.splitext(os.path.basename(path))[0] + "." + args.format)
+        write_output(output_path, landmarks, detected, label_index, confidence, fps[path], args.format)
+        total += len(landmarks)
+        falls = int((label_index == LABELS.index("Falling")).sum())
+        print(f"{path}: {len(landmarks)} frames, {int(detected.sum())} with a pose, {falls} Falling -> {output_path}")
+    elapsed = time.perf_counter() - started
+    print(f"{total} frames in {elapsed:.1f} s ({total / elapsed:.1f} fps)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import multiprocessing
+
+import numpy as np
+
+from stream_engine import DEFAULT_SETTINGS, MODEL_PATH
+
+VIDEO_PATH = os.path.join("video", "loitering_people.mp4")
+OUTPUT_DIR = "benchmarks"
+STAGES = ("decode", "pose", "feature", "lstm", "total")
+
+
+class VideoSource:
+    """Replays a video file in a loop, decoding every frame (no dropping)."""
+
+    def __init__(self, path):
+        import cv2
+
+        self.cv2 = cv2
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Cannot open {path}")
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret:
+            self.cap.set(self.cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+            if not ret:
+                raise RuntimeError("Video has no decodable frames")
+        return frame
+
+    def close(self):
+        self.cap.release()
+
+
+class SyntheticSource:
+    """Generated 8-bit BGR frames: a fixed noise background with a bright block moving across it.
+
+    Only the background is kept; each frame is drawn on a copy of it, so the
+    source adds one frame to the stream's memory, not a whole loop of them.
+    """
+
+    def __init__(self, width=1280, height=720, count=60, seed=0):
+        rng = np.random.default_rng(seed)
+        self.background = rng.integers(0, 64, (height, width, 3), dtype=np.uint8)
+        self.count = count
+        self.index = 0
+
+    def read(self):
+        height, width = self.background.shape[:2]
+        frame = self.background.copy()
+        x = (self.index % self.count * width // self.count) % (width - 200)
+        frame[height // 4:height // 4 + 300, x:x + 200] = 220
+        self.index += 1
+        return frame
+
+    def close(self):
+        pass
+
+
+def percentiles(samples):
+    """Latency summary in milliseconds."""
+    if len(samples) == 0:
+        return {"count": 0}
+    ms = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"count": len(ms), "mean": float(ms.mean()), "p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where it cannot be measured."""
+    try:
+        import resource
+    except ImportError:
+        # Windows has no resource module; psutil reports the peak working set there
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1 << 20)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def bench_stream(index, settings, options, barrier, results):
+    """Run one stream through decode -> pose -> feature -> LSTM and report its timings.
+
+    This is the loop from ``main.py``/``stream_engine.run_stream`` with the
+    stages timed separately; frames are read synchronously instead of
+    through a ``FrameGrabber`` so that no frame is dropped.
+    """
+    try:
+        import model_cache
+        from pose_pipeline import PosePipeline
+        from streaming_lstm import StreamingClassifier, StreamingLSTM
+        from ml_pipeline.features import load_scaler
+        from ml_pipeline.fall_gate import FallGate
+
+        model = model_cache.get_model(settings["model_path"], settings["backend"])
+        streaming = None
+        if settings["streaming"]:
+            streaming = StreamingClassifier(StreamingLSTM.from_keras(model.model))
+        scaler = load_scaler(settings["scaler"])
+        prefilter = FallGate(scaler=scaler) if settings["prefilter"] else None
+        pipeline = PosePipeline(model, stride=settings["stride"], streaming=streaming,
+                                inference_width=settings["inference_width"],
+                                motion_threshold=settings["motion_threshold"],
+                                scaler=scaler, prefilter=prefilter)
+        source = SyntheticSource(seed=index) if options["synthetic"] else VideoSource(options["video"])
+    except Exception as e:
+        barrier.abort()
+        results.put({"stream": index, "error": repr(e)})
+        return
+
+    timings = {stage: [] for stage in STAGES}
+    detected = 0
+    try:
+        for i in range(options["warmup"] + options["frames"]):
+            if i == options["warmup"]:
+                barrier.wait()
+                started = time.perf_counter()
+                timings = {stage: [] for stage in STAGES}
+                detected = 0
+                if prefilter is not None:
+                    prefilter.checked = prefilter.fired = 0
+            t0 = time.perf_counter()
+            frame = source.read()
+            t1 = time.perf_counter()
+            pose_results = pipeline.gate.process(frame)
+            t2 = time.perf_counter()
+            due = pipeline.update(pose_results)
+            t3 = time.perf_counter()
+            if due or (options["always_classify"] and not pose_results.pose_landmarks):
+                pipeline.classify()
+                t4 = time.perf_counter()
+                timings["lstm"].append(t4 - t3)
+            else:
+                t4 = t3
+            timings["decode"].append(t1 - t0)
+            timings["pose"].append(t2 - t1)
+            if pose_results.pose_landmarks:
+                detected += 1
+                timings["feature"].append(t3 - t2)
+            timings["total"].append(t4 - t0)
+        elapsed = time.perf_counter() - started
+    except Exception as e:
+        # Release the other streams waiting on the barrier
+        barrier.abort()
+        results.put({"stream": index, "error": repr(e)})
+        return
+    finally:
+        source.close()
+        pipeline.close()
+    results.put({
+        "stream": index,
+        "frames": options["frames"],
+        "elapsed": elapsed,
+        "detected": detected,
+        "pose_skip_ratio": pipeline.gate.skip_ratio(),
+        "prefilter_fire_rate": prefilter.fire_rate() if prefilter is not None else None,
+        "timings": timings,
+        "peak_rss_mb": peak_rss_mb(),
+    })
+
+
+def run_concurrent(streams, settings, options):
+    """Benchmark ``streams`` concurrent streams, one process each."""
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(streams)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=bench_stream, args=(i, settings, options, barrier, results), daemon=True)
+                 for i in range(streams)]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    errors = [r["error"] for r in reports if "error" in r]
+    if errors:
+        raise RuntimeError(f"Benchmark stream failed: {errors[0]}")
+
+    wall = max(r["elapsed"] for r in reports)
+    frames = sum(r["frames"] for r in reports)
+    stages = {stage: percentiles(np.concatenate([r["timings"][stage] for r in reports]))
+              for stage in STAGES}
+    rss = [r["peak_rss_mb"] for r in reports]
+    return {
+        "streams": streams,
+        "frames": frames,
+        "wall_s": wall,
+        "fps_total": frames / wall,
+        "fps_per_stream": frames / wall / streams,
+        "pose_detected_ratio": sum(r["detected"] for r in reports) / frames,
+        "pose_skip_ratio": float(np.mean([r["pose_skip_ratio"] for r in reports])),
+        "prefilter_fire_rate": (float(np.mean([r["prefilter_fire_rate"] for r in reports]))
+                                if reports[0]["prefilter_fire_rate"] is not None else None),
+        "stages_ms": stages,
+        "rss_mb_per_stream": ({"mean": float(np.mean(rss)), "max": float(np.max(rss))}
+                              if None not in rss else None),
+    }
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def format_run(run):
+    stages = "  ".join(
+        f"{stage} {s['p50']:.1f}/{s['p95']:.1f}/{s['p99']:.1f}" for stage, s in run["stages_ms"].items()
+        if s["count"])
+    rss = f"{run['rss_mb_per_stream']['max']:.0f} MB/stream" if run.get("rss_mb_per_stream") else "memory n/a"
+    gate = f", prefilter fires {run['prefilter_fire_rate']:.1%}" if run.get("prefilter_fire_rate") is not None else ""
+    return (f"{run['streams']:>2} stream(s): {run['fps_total']:7.1f} fps total, {run['fps_per_stream']:6.1f} per stream, "
+            f"{rss}{gate} | p50/p95/p99 ms: {stages}")
+
+
+def compare(report, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {run["streams"]: run for run in baseline["runs"]}
+    print(f"Compared with {baseline_path} ({baseline.get('commit', 'unknown')}):")
+    for run in report["runs"]:
+        old = previous.get(run["streams"])
+        if old is None:
+            continue
+        fps = (run["fps_total"] / old["fps_total"] - 1) * 100
+        p95 = run["stages_ms"]["total"]["p95"] - old["stages_ms"]["total"]["p95"]
+        print(f"{run['streams']:>2} stream(s): fps {fps:+.1f}%, total p95 {p95:+.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the decode -> pose -> feature -> LSTM path without GUI or network")
+    parser.add_argument("--video", default=VIDEO_PATH)
+    parser.add_argument("--synthetic", action="store_true", help="use generated frames instead of the video")
+    parser.add_argument("--streams", type=int, default=1, help="benchmark 1..N concurrent streams")
+    parser.add_argument("--frames", type=int, default=300, help="measured frames per stream")
+    parser.add_argument("--warmup", type=int, default=30, help="unmeasured frames per stream")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--backend", choices=["keras", "tflite", "onnx"], default=None)
+    parser.add_argument("--stride", type=int, default=1)
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--inference-width", type=int, default=DEFAULT_SETTINGS["inference_width"])
+    parser.add_argument("--motion-threshold", type=float, default=DEFAULT_SETTINGS["motion_threshold"])
+    parser.add_argument("--prefilter", action="store_true",
+                        help="gate the LSTM with ml_pipeline.fall_gate and report how often it fires")
+    parser.add_argument("--always-classify", action="store_true",
+                        help="also run the LSTM on frames without a pose (useful with --synthetic)")
+    parser.add_argument("--output", default=None, help=f"JSON results path (default: {OUTPUT_DIR}/<commit>_<time>.json)")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+    if args.frames < 1:
+        parser.error("--frames must be at least 1")
+    if args.streaming and args.always_classify:
+        parser.error("--always-classify cannot be combined with --streaming")
+
+    settings = dict(DEFAULT_SETTINGS, model_path=args.model, backend=args.backend, stride=args.stride,
+                    streaming=args.streaming, inference_width=args.inference_width,
+                    motion_threshold=args.motion_threshold, prefilter=args.prefilter)
+    options = {"video": args.video, "synthetic": args.synthetic, "frames": args.frames,
+               "warmup": args.warmup, "always_classify": args.always_classify}
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "source": "synthetic" if args.synthetic else args.video,
+        "settings": settings,
+        "options": options,
+        "runs": [],
+    }
+    for streams in range(1, args.streams + 1):
+        run = run_concurrent(streams, settings, options)
+        report["runs"].append(run)
+        print(format_run(run))
+
+    output = args.output or os.path.join(
+        OUTPUT_DIR, f"{report['commit']}_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import os
+import time
+import queue
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+CLIP_DIR = "clips"
+
+
+class ClipWriter:
+    """Writes event clips to MP4 on a background thread.
+
+    Clips arrive as lists of ``(timestamp, jpeg_bytes)``; decoding and
+    encoding happen here, so ``submit`` never blocks a detection loop. Each
+    clip is written to a hidden temporary file and renamed into place, so a
+    path that exists always holds a complete clip. One writer is shared by
+    every stream.
+    """
+
+    def __init__(self, directory=CLIP_DIR, fourcc="mp4v"):
+        self.directory = directory
+        self.fourcc = fourcc
+        self.written = 0
+        self.failed = 0
+        os.makedirs(directory, exist_ok=True)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, path, frames):
+        if frames:
+            self._queue.put((path, frames))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            path, frames = item
+            try:
+                self._write(path, frames)
+                self.written += 1
+            except (cv2.error, OSError, ValueError) as e:
+                self.failed += 1
+                print(f"Lỗi ghi clip {path}: {e}")
+
+    def _write(self, path, frames):
+        first = cv2.imdecode(np.frombuffer(frames[0][1], dtype=np.uint8), cv2.IMREAD_COLOR)
+        if first is None:
+            raise ValueError("undecodable frame")
+        height, width = first.shape[:2]
+        # Frames were sampled at up to the buffer's rate; play them back at the rate they were captured
+        span = frames[-1][0] - frames[0][0]
+        fps = (len(frames) - 1) / span if len(frames) > 1 and span > 0 else 1.0
+        directory, name = os.path.split(path)
+        tmp_path = os.path.join(directory, "." + name)
+        writer = cv2.VideoWriter(tmp_path, cv2.VideoWriter_fourcc(*self.fourcc), fps, (width, height))
+        if not writer.isOpened():
+            raise ValueError(f"cannot open a {self.fourcc} writer")
+        try:
+            for _, jpeg in frames:
+                image = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if image is None:
+                    continue
+                if image.shape[:2] != (height, width):
+                    # The stream reconnected at another resolution
+                    image = cv2.resize(image, (width, height))
+                writer.write(image)
+        finally:
+            writer.release()
+        os.replace(tmp_path, path)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+class ClipBuffer:
+    """Last ``pre_seconds`` of one stream as JPEG frames, turned into a clip on ``trigger``.
+
+    ``add`` keeps at most ``fps`` frames per second, JPEG-encoded at
+    ``quality``, and trims the ring to ``pre_seconds`` and ``max_bytes``, so
+    memory per camera stays bounded no matter the stream resolution or
+    rate. Frames are encoded as they arrive because capture buffers (e.g.
+    ``FFmpegCapture``) are reused. ``trigger`` returns the clip's path
+    straight away; the clip collects ``post_seconds`` more frames and is then
+    handed to the ``ClipWriter``. Triggers while a clip is still collecting
+    return that clip's path.
+    """
+
+    def __init__(self, writer, name, pre_seconds=10.0, post_seconds=5.0, fps=10.0, quality=80,
+                 max_bytes=16 << 20, rgb=False):
+        self.writer = writer
+        self.name = name
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.interval = 1.0 / fps
+        self.quality = quality
+        self.max_bytes = max_bytes
+        self.rgb = rgb
+        self._frames = deque()
+        self._bytes = 0
+        self._last = None
+        self._pending = None  # (path, frames, deadline)
+
+    def add(self, frame, now=None):
+        """Buffer ``frame`` (BGR, or RGB with ``rgb``) if it is due under the sampling rate."""
+        now = time.monotonic() if now is None else now
+        # A millisecond of slack so e.g. every third frame of a 30 fps stream makes 10 fps
+        if self._last is None or now - self._last >= self.interval - 1e-3:
+            self._last = now
+            image = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR) if self.rgb else frame
+            ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if ok:
+                jpeg = encoded.tobytes()
+                self._frames.append((now, jpeg))
+                self._bytes += len(jpeg)
+                while self._frames and (now - self._frames[0][0] > self.pre_seconds or self._bytes > self.max_bytes):
+                    self._bytes -= len(self._frames.popleft()[1])
+                if self._pending is not None:
+                    self._pending[1].append((now, jpeg))
+        if self._pending is not None and now >= self._pending[2]:
+            self.flush()
+
+    def trigger(self, now=None):
+        """Start a clip of the buffered frames plus the next ``post_seconds``; returns its path."""
+        if self._pending is not None:
+            return self._pending[0]
+        now = time.monotonic() if now is None else now
+        wall = time.time()
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(wall)) + f"_{int(wall * 1000) % 1000:03d}"
+        path = os.path.join(self.writer.directory, f"{self.name}_{stamp}.mp4")
+        self._pending = (path, list(self._frames), now + self.post_seconds)
+        return path
+
+    def flush(self):
+        """Hand a collecting clip to the writer now (e.g. when the stream ends)."""
+        if self._pending is not None:
+            path, frames, _ = self._pending
+            self._pending = None
+            self.writer.submit(path, frames)
+
+    @property
+    def buffered_bytes(self):
+        return self._bytes
@@ -0,0 +1,169 @@
+import sys
+import time
+import queue
+import sqlite3
+import argparse
+import threading
+
+DB_PATH = "streams.db"
+
+
+class EventStore:
+    """Detection events in streams.db, written in batches by a background thread.
+
+    ``record`` is cheap and non-blocking: it drops repeats of a stream's
+    current label and queues label changes. The writer thread inserts them
+    with one ``executemany`` per batch (at most ``batch_size`` rows or
+    ``flush_interval`` seconds) on a WAL-mode connection, so many streams
+    never serialize on per-frame commits. An event can carry the path of
+    the clip recorded around it (``clip_recorder.ClipBuffer.trigger``).
+    """
+
+    def __init__(self, db_path=DB_PATH, batch_size=100, flush_interval=1.0):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._last_label = {}
+        self._lock = threading.Lock()
+        self.written = 0
+        conn = self._connect()
+        try:
+            self._create_schema(conn)
+        finally:
+            conn.close()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _create_schema(self, conn):
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS detections (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    stream_id INTEGER,
+                    label TEXT,
+                    confidence REAL,
+                    timestamp REAL,
+                    clip_path TEXT
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(detections)")}
+            if "clip_path" not in columns:
+                # Databases created before clips were recorded
+                conn.execute("ALTER TABLE detections ADD COLUMN clip_path TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_detections_stream_time ON detections (stream_id, timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_detections_label_time ON detections (label, timestamp)")
+
+    def record(self, stream_id, label, confidence, timestamp=None, clip_path=None):
+        """Queue an event if ``label`` differs from the stream's last one; returns True if queued."""
+        with self._lock:
+            if self._last_label.get(stream_id) == label:
+                return False
+            self._last_label[stream_id] = label
+        self._queue.put((stream_id, label, float(confidence), timestamp or time.time(), clip_path))
+        return True
+
+    def _run(self):
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            rows = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(rows) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                rows.append(item)
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO detections (stream_id, label, confidence, timestamp, clip_path) "
+                        "VALUES (?, ?, ?, ?, ?)", rows)
+                self.written += len(rows)
+            except sqlite3.Error as e:
+                print(f"Lỗi ghi sự kiện: {e}")
+            for _ in rows:
+                self._queue.task_done()
+        conn.close()
+
+    def flush(self):
+        """Block until every queued event has been written."""
+        self._queue.join()
+
+    def query(self, label=None, hours=None, stream_id=None, limit=None):
+        """Return events newest first as dicts, optionally filtered by label, age and stream."""
+        sql = ("SELECT d.id, d.stream_id, s.url, d.label, d.confidence, d.timestamp, d.clip_path "
+               "FROM detections d LEFT JOIN streams s ON s.id = d.stream_id")
+        clauses, params = [], []
+        if label is not None:
+            clauses.append("d.label = ?")
+            params.append(label)
+        if hours is not None:
+            clauses.append("d.timestamp >= ?")
+            params.append(time.time() - hours * 3600)
+        if stream_id is not None:
+            clauses.append("d.stream_id = ?")
+            params.append(stream_id)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY d.timestamp DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        keys = ("id", "stream_id", "url", "label", "confidence", "timestamp", "clip_path")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def falls(self, hours=24):
+        """All Falling events across cameras in the last ``hours`` hours."""
+        return self.query(label="Falling", hours=hours)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query detection events stored in streams.db")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--label", default="Falling")
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--stream", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    store = EventStore(args.db)
+    try:
+        for event in store.query(args.label, args.hours, args.stream, args.limit):
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(event["timestamp"]))
+            clip = f" clip: {event['clip_path']}" if event["clip_path"] else ""
+            print(f"[{stamp}] stream {event['stream_id']} ({event['url']}): {event['label']} "
+                  f"({event['confidence']:.2f}){clip}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import os
+import threading
+import subprocess
+
+import numpy as np
+
+FFMPEG = os.environ.get("FFMPEG", "ffmpeg")
+FFPROBE = os.environ.get("FFPROBE", "ffprobe")
+
+
+def probe_size(url, ffprobe=FFPROBE, timeout=15):
+    """Return the ``(width, height)`` of the first video stream of ``url``."""
+    out = subprocess.run(
+        [ffprobe, "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=width,height",
+         "-of", "csv=p=0:s=x", url],
+        capture_output=True, text=True, timeout=timeout, check=True)
+    width, height = out.stdout.strip().splitlines()[0].split("x")
+    return int(width), int(height)
+
+
+class FFmpegCapture:
+    """``cv2.VideoCapture`` stand-in that decodes through an ffmpeg subprocess.
+
+    ffmpeg does the scaling, frame-rate reduction and conversion to packed
+    RGB, so frames arrive at inference resolution and need no ``cvtColor``.
+    ``read`` fills a free ``bytearray`` from a pool with ``readinto`` and
+    returns an ``np.frombuffer`` view of it. The frame belongs to the caller
+    until it hands it back with ``recycle``; a buffer is never refilled
+    while it is out, and the pool grows when every buffer is in use.
+    ``FrameGrabber`` recycles dropped frames and each frame it handed out
+    once the next one is read, so ``buffers=3`` (one being filled, the
+    latest slot, the frame being processed) is enough in steady state.
+    Without recycling every read allocates a new buffer. Frames are RGB,
+    not BGR.
+
+    Pass ``width`` and ``height`` to skip probing the source; with only
+    ``width`` the source aspect ratio is kept (never upscaled). Network
+    sources get an ``io_timeout`` (seconds) so ffmpeg gives up on a hung
+    connection by itself, and ``interrupt`` kills ffmpeg from another thread
+    so a ``read`` blocked on the pipe returns at once.
+    """
+
+    def __init__(self, url, width=None, height=None, fps=None, buffers=3, ffmpeg=FFMPEG,
+                 rtsp_transport="tcp", io_timeout=10.0):
+        self.url = url
+        self.proc = None
+        if width is None or height is None:
+            try:
+                source_width, source_height = probe_size(url)
+            except (OSError, ValueError, IndexError, subprocess.SubprocessError):
+                return
+            if width is None:
+                width, height = source_width, source_height
+            else:
+                width = min(width, source_width)
+                height = max(2, round(source_height * width / source_width / 2) * 2)
+        self.width = width
+        self.height = height
+        self.frame_bytes = width * height * 3
+        self._free = [self._allocate() for _ in range(max(1, buffers))]
+        self._out = {}  # id(frame) -> (frame, view) for buffers owned by the caller
+        self._lock = threading.Lock()
+
+        command = [ffmpeg, "-hide_banner", "-loglevel", "error", "-nostdin"]
+        if url.startswith("rtsp://"):
+            command += ["-rtsp_transport", rtsp_transport, "-fflags", "nobuffer", "-flags", "low_delay"]
+        # Both options take microseconds; the RTSP demuxer ignores the generic -rw_timeout
+        if io_timeout and url.startswith("rtsp://"):
+            command += ["-timeout", str(int(io_timeout * 1e6))]
+        elif io_timeout and "://" in url:
+            command += ["-rw_timeout", str(int(io_timeout * 1e6))]
+        filters = ([f"fps={fps}"] if fps else []) + [f"scale={width}:{height}"]
+        command += ["-i", url, "-an", "-sn", "-vf", ",".join(filters),
+                    "-pix_fmt", "rgb24", "-f", "rawvideo", "pipe:1"]
+        try:
+            self.proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0)
+        except OSError:
+            self.proc = None
+
+    def _allocate(self):
+        buffer = bytearray(self.frame_bytes)
+        return np.frombuffer(buffer, dtype=np.uint8).reshape(self.height, self.width, 3), memoryview(buffer)
+
+    def recycle(self, frame):
+        """Return a frame from ``read`` to the pool; it must not be used afterwards."""
+        with self._lock:
+            entry = self._out.pop(id(frame), None)
+            if entry is not None and entry[0] is frame:
+                self._free.append(entry)
+
+    def isOpened(self):
+        return self.proc is not None and self.proc.stdout is not None
+
+    def read(self):
+        """Return ``(True, frame)`` with an ``(height, width, 3)`` RGB view, or ``(False, None)``."""
+        if not self.isOpened():
+            return False, None
+        with self._lock:
+            entry = self._free.pop() if self._free else self._allocate()
+        frame, view = entry
+        filled = 0
+        while filled < self.frame_bytes:
+            n = self.proc.stdout.readinto(view[filled:])
+            if not n:
+                with self._lock:
+                    self._free.append(entry)
+                return False, None
+            filled += n
+        with self._lock:
+            self._out[id(frame)] = entry
+        return True, frame
+
+    def interrupt(self):
+        """Kill ffmpeg so a ``read`` blocked on a hung source returns; safe from any thread.
+
+        The reader still owns the pipe and calls ``release`` to reap the process.
+        """
+        proc = self.proc
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+
+    def release(self):
+        if self.proc is None:
+            return
+        proc, self.proc = self.proc, None
+        proc.terminate()
+        try:
+            proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
@@ -0,0 +1,94 @@
+import time
+import threading
+
+
+class FrameGrabber:
+    """Reads a ``cv2.VideoCapture`` on its own thread, newest frame wins.
+
+    The capture thread drains the decoder as fast as it delivers frames and
+    keeps only the latest one in a single slot. If processing falls behind,
+    unconsumed frames are overwritten and counted in ``dropped`` instead of
+    piling up in FFmpeg's buffer, so latency stays bounded.
+
+    Captures with pooled frame buffers (``FFmpegCapture``) get every
+    dropped frame back through ``recycle``, and the frame returned by
+    ``read`` once the next ``read`` happens: a frame stays valid until the
+    consumer asks for another one.
+    """
+
+    def __init__(self, cap):
+        self.cap = cap
+        self._recycle = getattr(cap, "recycle", None)
+        self._out = None
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_time = None
+        self._thread = None
+        self.running = False
+        self.frames = 0
+        self.dropped = 0
+        self.timestamp = None
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            while self.running:
+                ret, frame = self.cap.read()
+                with self._cond:
+                    if not ret:
+                        break
+                    if self._frame is not None:
+                        self.dropped += 1
+                        if self._recycle is not None:
+                            self._recycle(self._frame)
+                    self._frame = frame
+                    self._frame_time = time.monotonic()
+                    self.frames += 1
+                    self._cond.notify_all()
+        finally:
+            # Released here so a read blocked inside FFmpeg never races with release()
+            self.cap.release()
+            with self._cond:
+                self.running = False
+                self._cond.notify_all()
+
+    def read(self, timeout=None):
+        """Block until a frame newer than the last one read is available.
+
+        Returns ``(ret, frame)`` like ``cv2.VideoCapture.read``; ``ret`` is
+        False once the capture has ended or ``timeout`` seconds pass. The
+        capture time of the returned frame is kept in ``timestamp``.
+        """
+        with self._cond:
+            if self._out is not None and self._recycle is not None:
+                # The consumer is done with the previous frame once it asks for the next one
+                self._recycle(self._out)
+            self._out = None
+            if not self._cond.wait_for(lambda: self._frame is not None or not self.running, timeout):
+                return False, None
+            frame, self._frame = self._frame, None
+            if frame is None:
+                return False, None
+            self.timestamp = self._frame_time
+            self._out = frame
+            return True, frame
+
+    @property
+    def last_frame_time(self):
+        """``time.monotonic()`` of the newest decoded frame, None before the first one."""
+        return self._frame_time
+
+    def isOpened(self):
+        return self.running or self._frame is not None
+
+    def stop(self, timeout=2):
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
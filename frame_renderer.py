@@ -0,0 +1,77 @@
+import time
+
+import cv2
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+GRID_STEP = 50
+GRID_VALUE = 200
+
+
+def grid_mask(height, width, step=GRID_STEP):
+    """Boolean mask of the 1px grid lines drawn every ``step`` pixels."""
+    mask = np.zeros((height, width), dtype=bool)
+    mask[::step, :] = True
+    mask[:, ::step] = True
+    return mask
+
+
+class FrameRenderer(QObject):
+    """Thread-safe, throttled path from worker threads to a ``QLabel``.
+
+    Create it on the GUI thread. Workers ask ``ready()`` whether a frame is
+    due (at most ``max_fps`` per second, independent of the processing rate)
+    and only then draw on the frame and ``submit`` it; the image crosses to
+    the GUI thread through a queued Qt signal. The grid is a mask cached per
+    frame size and applied in one vectorized assignment. Frames are BGR
+    unless ``rgb`` is set.
+    """
+
+    frame_ready = pyqtSignal(QImage)
+
+    def __init__(self, label, max_fps=15, grid_step=None, grayscale=False, rgb=False, parent=None):
+        super().__init__(parent)
+        self.label = label
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.grid_step = grid_step
+        self.grayscale = grayscale
+        self.rgb = rgb
+        self.rendered = 0
+        self.skipped = 0
+        self._last = 0.0
+        self._mask = None
+        self.frame_ready.connect(self._show)
+
+    def ready(self):
+        """Reserve the next display slot; False means skip rendering this frame."""
+        now = time.monotonic()
+        if now - self._last < self.min_interval:
+            self.skipped += 1
+            return False
+        self._last = now
+        return True
+
+    def submit(self, frame):
+        """Convert a frame to a ``QImage`` and hand it to the GUI thread."""
+        if self.grayscale:
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY if self.rgb else cv2.COLOR_BGR2GRAY)
+        elif self.rgb:
+            # Copied so the grid never lands in a capture buffer that is still in use
+            frame = frame.copy() if self.grid_step else frame
+        else:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if self.grid_step:
+            h, w = frame.shape[:2]
+            if self._mask is None or self._mask.shape != (h, w):
+                self._mask = grid_mask(h, w, self.grid_step)
+            frame[self._mask] = GRID_VALUE
+        h, w = frame.shape[:2]
+        fmt = QImage.Format_Grayscale8 if self.grayscale else QImage.Format_RGB888
+        # copy() detaches the image from the NumPy buffer before it leaves this thread
+        image = QImage(frame.data, w, h, frame.strides[0], fmt).copy()
+        self.rendered += 1
+        self.frame_ready.emit(image)
+
+    def _show(self, image):
+        self.label.setPixmap(QPixmap.fromImage(image))
@@ -0,0 +1,105 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+LABELS = ["Falling", "Sitting", "Standing"]
+
+
+def decode_prediction(prediction):
+    """Turn one row of class probabilities into ``(label, confidence)``."""
+    label = int(np.argmax(prediction))
+    return LABELS[label], float(prediction[label])
+
+
+class BatchInferenceServer:
+    """Micro-batches landmark windows from many streams into one model call.
+
+    Streams call ``submit`` with their current window and get back a
+    ``Future`` resolving to the class probabilities for that window. A
+    background thread waits for the first request, keeps collecting until it
+    has ``max_batch_size`` windows or ``max_wait_ms`` has passed, then runs
+    ``predict_fn`` once on the whole batch.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=5):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._requests = queue.Queue()
+        self._inputs = None
+        self._thread = None
+        self.batches = 0
+        self.samples = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._requests.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, stream_id, window):
+        """Queue a ``(T, F)`` or ``(1, T, F)`` window for classification.
+
+        The window is copied, so ring-buffer views may be passed directly.
+        """
+        window = np.array(window, dtype=np.float32)
+        if window.ndim == 3:
+            window = window[0]
+        future = Future()
+        self._requests.put((stream_id, window, future))
+        return future
+
+    def mean_batch_size(self):
+        return self.samples / self.batches if self.batches else 0.0
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._requests.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        shape = batch[0][1].shape
+        if self._inputs is None or self._inputs.shape[1:] != shape:
+            self._inputs = np.empty((self.max_batch_size,) + shape, dtype=np.float32)
+        inputs = self._inputs[:len(batch)]
+        for i, (_, window, _) in enumerate(batch):
+            inputs[i] = window
+        try:
+            predictions = np.asarray(self.predict_fn(inputs))
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.samples += len(batch)
+        for (_, _, future), prediction in zip(batch, predictions):
+            future.set_result(prediction)
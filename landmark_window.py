@@ -0,0 +1,46 @@
+import numpy as np
+
+
+class LandmarkWindow:
+    """Fixed-size float32 ring buffer holding the last ``length`` landmark frames.
+
+    Every frame is written twice, at ``pos`` and ``pos + length``, into a
+    buffer of ``2 * length`` rows. The last ``length`` frames are then always a
+    contiguous slice, so ``view()`` hands the model a zero-copy
+    ``(1, length, num_features)`` array and ``append`` stays O(1).
+    """
+
+    def __init__(self, length=100, num_features=132):
+        self.length = length
+        self.num_features = num_features
+        self._buffer = np.zeros((2 * length, num_features), dtype=np.float32)
+        self._pos = 0
+        self.count = 0
+
+    def append(self, landmarks):
+        """Copy one frame into the window, zero-padding or truncating to ``num_features``."""
+        landmarks = np.asarray(landmarks, dtype=np.float32).ravel()
+        n = min(landmarks.shape[0], self.num_features)
+        for row in (self._pos, self._pos + self.length):
+            self._buffer[row, :n] = landmarks[:n]
+            self._buffer[row, n:] = 0.0
+        self._pos = (self._pos + 1) % self.length
+        self.count += 1
+
+    def is_full(self):
+        return self.count >= self.length
+
+    def view(self):
+        """Return the window oldest-first as a ``(1, length, num_features)`` view.
+
+        The view aliases the internal buffer and is overwritten by later
+        ``append`` calls; copy it if it has to outlive the next frame.
+        """
+        return self._buffer[self._pos:self._pos + self.length][np.newaxis]
+
+    def clear(self):
+        self._pos = 0
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.length)
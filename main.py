@@ -1,25 +1,78 @@
+import time
+_import_start = time.perf_counter()
 import sys
-import cv2
 import sqlite3
+import logging
 import threading
-import numpy as np
-import mediapipe as mp
-from keras.models import load_model
+import model_cache
+from metrics import metrics, log, serve, RateLimitedLog, SamplingProfiler
+from inference_server import BatchInferenceServer
+from streaming_lstm import StreamingLSTM, StreamingClassifier
+from stream_supervisor import StreamSupervisor, open_capture
+from ffmpeg_capture import FFmpegCapture
+from frame_renderer import FrameRenderer
+from event_store import EventStore
+from clip_recorder import ClipWriter, ClipBuffer
+from ml_pipeline.features import load_scaler
+from ml_pipeline.fall_gate import FallGate
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QLineEdit, QListWidget, QMessageBox
-from PyQt5.QtCore import QTimer
-from PyQt5.QtGui import QImage, QPixmap
-import time
+from PyQt5.QtCore import QTimer, pyqtSignal
+import os
+model_cache.record_timing("import", time.perf_counter() - _import_start)
+
+# Model file and runtime; POSE_BACKEND is keras, tflite or onnx (guessed from the extension if unset)
+MODEL_PATH = os.environ.get("POSE_MODEL", "./ml_pipeline/model.h5")
+INFERENCE_BACKEND = os.environ.get("POSE_BACKEND") or None
+# Optional JSON file receiving the startup-time breakdown
+STARTUP_REPORT = os.environ.get("POSE_STARTUP_REPORT")
+# Prometheus-text /metrics on localhost (0 disables); POSE_PROFILE_MS > 0 also samples stacks at /profile
+METRICS_PORT = int(os.environ.get("POSE_METRICS_PORT", "9100"))
+PROFILE_MS = float(os.environ.get("POSE_PROFILE_MS", "0"))
+# POSE_CAPTURE=ffmpeg decodes through an ffmpeg pipe, already scaled and in RGB
+CAPTURE_BACKEND = os.environ.get("POSE_CAPTURE", "opencv")
+# With ffmpeg capture, have ffmpeg drop frames down to this rate (like stream_engine.py --capture-fps)
+CAPTURE_FPS = float(os.environ["POSE_CAPTURE_FPS"]) if os.environ.get("POSE_CAPTURE_FPS") else None
+
+# Per-frame events are logged at most once per stream every few seconds
+log_event = RateLimitedLog(interval=5.0)
+metrics.describe("stage_seconds", "Time spent per display_stream stage")
+metrics.describe("frames_total", "Frames read from the stream")
+metrics.describe("frames_dropped_total", "Frames the grabber replaced before they were processed")
+metrics.describe("pose_detected_total", "Frames with a detected pose")
+metrics.describe("errors_total", "Failed, ended or stalled captures")
+metrics.describe("stream_state_changes_total", "Capture supervisor transitions (connecting, live, stalled, backoff)")
+metrics.describe("prefilter_windows_total", "Due windows the fall prefilter passed to the LSTM (fired) or skipped")
+
+# Built by load_inference(), started in the background at startup
+_inference_lock = threading.Lock()
+model = None
+inference_server = None
+streaming_network = None
+scaler = None
 
 
-# Load trained model
-model = load_model("./ml_pipeline/model.h5")
+def load_inference():
+    """Load the model, the shared batch server and the streaming copy once (preloaded at startup)."""
+    global model, inference_server, streaming_network, scaler
+    with _inference_lock:
+        if model is None:
+            with model_cache.timed("mediapipe import"):
+                import pose_pipeline  # noqa: F401
+            model = model_cache.get_model(MODEL_PATH, INFERENCE_BACKEND)
+            # Windows from every watched stream are classified together in one batch
+            inference_server = BatchInferenceServer(model.predict, max_batch_size=32, max_wait_ms=5).start()
+            # NumPy one-step copy of the same network for streaming (stateful) inference, Keras weights only
+            streaming_network = StreamingLSTM.from_keras(model.model) if model.name == "keras" else None
+            # Feature scaler from POSE_SCALER (off by default, like the shipped model's training)
+            scaler = load_scaler()
+            print(model_cache.startup_report(STARTUP_REPORT))
+    return model
 
-# Mediapipe Pose Setup
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose()
-mp_drawing = mp.solutions.drawing_utils
 
 class PoseStreamApp(QWidget):
+    # Worker threads update the status label through this (queued) signal
+    status_changed = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Pose Detection Stream")
@@ -28,11 +81,27 @@ class PoseStreamApp(QWidget):
         self.init_ui()
         self.load_saved_urls()
         self.timer = QTimer(self)
-        self.sequence = []
         self.no_of_timesteps = 100
         self.num_features = 132  # Ensure input shape matches model
+        self.inference_stride = 1  # Classify every k-th frame once the window is full
+        self.streaming_inference = False  # Step the LSTM once per frame instead of re-running the window
+        self.resync_every = 100  # Rebuild the streaming state from the full window every N frames
+        self.inference_width = 640  # Downscale frames wider than this before pose estimation
+        self.motion_threshold = 0.0  # Reuse the last landmarks while motion stays below this (0 = off)
+        self.fall_prefilter = False  # Only run the LSTM on windows with fall-like torso motion or posture
+        self.display_fps = 15  # Display refresh cap, independent of the processing rate
+        self.rgb_frames = CAPTURE_BACKEND == "ffmpeg"
+        self.renderer = FrameRenderer(self.video_label, self.display_fps, grid_step=50, grayscale=True,
+                                      rgb=self.rgb_frames, parent=self)
+        self.supervisors = []  # One per watched stream, stopped when the window closes
+        self.stream_threads = []  # display_stream threads, joined before the stores close
+        self.clip_pre_seconds = 10  # Seconds of video kept before a Falling detection
+        self.clip_post_seconds = 5  # Seconds recorded after it
+        self.clips = ClipWriter("clips")  # MP4 clips are written off the detection loop
 
     def init_db(self):
+        # Detections are persisted by a background writer in the same database
+        self.events = EventStore("streams.db")
         self.conn = sqlite3.connect("streams.db")
         self.cursor = self.conn.cursor()
         self.cursor.execute("""
@@ -70,6 +139,7 @@ class PoseStreamApp(QWidget):
         
         self.result_label = QLabel("Status: Not Started", self)
         self.layout.addWidget(self.result_label)
+        self.status_changed.connect(self.result_label.setText)
         
         self.setLayout(self.layout)
     
@@ -103,83 +173,130 @@ class PoseStreamApp(QWidget):
         if selected_item:
             url = selected_item.text()
             print(f"Đang xem stream từ URL: {url}")  # Debug log
-            threading.Thread(target=self.display_stream, args=(url,), daemon=True).start()
+            self.cursor.execute("SELECT id FROM streams WHERE url = ?", (url,))
+            stream_id = self.cursor.fetchone()[0]
+            thread = threading.Thread(target=self.display_stream, args=(url, stream_id), daemon=True)
+            self.stream_threads.append(thread)
+            thread.start()
         else:
             print("Lỗi: Không có stream nào được chọn!")
     
-    def display_stream(self, url):
-        cap = cv2.VideoCapture(url)
+    def display_stream(self, url, stream_id=None):
+        # Mediapipe and the model are only loaded (and warmed up) once a stream is watched
+        load_inference()
+        from pose_pipeline import PosePipeline, mp_pose, mp_drawing
 
-        # Kiểm tra xem có mở được stream hay không
-        if not cap.isOpened():
-            print(f"Lỗi: Không mở được stream từ {url}")
-            self.result_label.setText("Lỗi: Không mở được stream")
-            return
+        streaming = None
+        if self.streaming_inference and streaming_network is not None:
+            streaming = StreamingClassifier(streaming_network, self.no_of_timesteps, self.resync_every)
+        prefilter = FallGate(scaler=scaler) if self.fall_prefilter else None
+        pipeline = PosePipeline(model, self.no_of_timesteps, self.num_features, self.inference_stride,
+                                server=inference_server, stream_id=url, streaming=streaming,
+                                inference_width=self.inference_width, motion_threshold=self.motion_threshold,
+                                rgb=self.rgb_frames, scaler=scaler, prefilter=prefilter)
+        # Capture runs on its own thread; stale frames are dropped instead of queueing up.
+        # Failed or stalled captures are reopened with backoff while the pipeline (and its
+        # landmark window) stays in place.
+        def on_state(state):
+            metrics.inc("stream_state_changes_total", stream=stream_id, state=state)
+            log.info(f"event=stream_state stream={stream_id} state={state}")
+            if state == "backoff":
+                metrics.inc("errors_total", stream=stream_id)
+            if state != "live":
+                self.status_changed.emit(f"Stream: {state}")
 
-        while cap.isOpened():
-            ret, frame = cap.read()
+        opener = open_capture
+        if self.rgb_frames:
+            def opener(url):
+                return FFmpegCapture(url, width=self.inference_width, fps=CAPTURE_FPS)
+        supervisor = StreamSupervisor(url, opener, on_state=on_state).start()
+        self.supervisors.append(supervisor)
+        clip_buffer = ClipBuffer(self.clips, f"stream_{stream_id}", self.clip_pre_seconds, self.clip_post_seconds,
+                                 rgb=self.rgb_frames)
+        observe = metrics.observe
+        dropped = 0
+        checked = gate_fired = 0
+        last_label = None
+        while supervisor.is_running():
+            t0 = time.perf_counter()
+            ret, frame = supervisor.read(timeout=1.0)
+            t1 = time.perf_counter()
             if ret:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = pose.process(frame_rgb)
-                
+                # Only the wait for the grabber's newest frame; decoding runs on the grabber thread
+                observe("stage_seconds", t1 - t0, stage="read", stream=stream_id)
+                metrics.inc("frames_total", stream=stream_id)
+                if supervisor.dropped != dropped:
+                    metrics.inc("frames_dropped_total", supervisor.dropped - dropped, stream=stream_id)
+                    dropped = supervisor.dropped
+                # Buffered before landmarks are drawn onto the frame
+                with metrics.timer("stage_seconds", stage="clip", stream=stream_id):
+                    clip_buffer.add(frame)
+                t1 = time.perf_counter()
+                results = pipeline.gate.process(frame)
+                t2 = time.perf_counter()
+                due = pipeline.update(results)
+                t3 = time.perf_counter()
+                observe("stage_seconds", t2 - t1, stage="pose", stream=stream_id)
+                observe("stage_seconds", t3 - t2, stage="feature", stream=stream_id)
+                if prefilter is not None and prefilter.checked != checked:
+                    # The gate's own decision: `due` is also set by the settle pass after it closes
+                    fired = prefilter.fired != gate_fired
+                    checked, gate_fired = prefilter.checked, prefilter.fired
+                    metrics.inc("prefilter_windows_total", stream=stream_id, result="fired" if fired else "skipped")
+
                 if results.pose_landmarks:
-                    print("Pose detected successfully")
-                    mp_drawing.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-                    landmarks = []
-                    for lm in results.pose_landmarks.landmark:
-                        landmarks.append(lm.x)
-                        landmarks.append(lm.y)
-                        landmarks.append(lm.z)
-                        landmarks.append(lm.visibility)
-                    
-                    while len(landmarks) < self.num_features:
-                        landmarks.append(0.0)
-                    landmarks = np.array(landmarks[:self.num_features])
-                    
-                    self.sequence.append(landmarks)
-                    if len(self.sequence) > self.no_of_timesteps:
-                        self.sequence.pop(0)
-                    
-                    if len(self.sequence) == self.no_of_timesteps:
-                        prediction = model.predict(np.expand_dims(self.sequence, axis=0))
-                        label = np.argmax(prediction)
-                        labels = ["Falling", "Sitting", "Standing"]
-                        detected_label = labels[label]
-                        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-                        print(f"[{timestamp}] Phát hiện: {detected_label}")
-                        self.result_label.setText(f"Detected: {labels[label]}")
+                    metrics.inc("pose_detected_total", stream=stream_id)
+                    log_event("pose_detected", logging.DEBUG, key=stream_id, stream=stream_id)
+                    if due:
+                        detected_label, confidence = pipeline.classify()
+                        observe("stage_seconds", time.perf_counter() - t3, stage="lstm", stream=stream_id)
+                        log_event("detection", key=(stream_id, detected_label), stream=stream_id,
+                                  label=detected_label, confidence=f"{confidence:.2f}")
+                        self.status_changed.emit(f"Detected: {detected_label}")
+                        clip_path = None
+                        if detected_label == "Falling" and last_label != "Falling":
+                            clip_path = clip_buffer.trigger()
+                            log.info(f"event=clip stream={stream_id} path={clip_path}")
+                        last_label = detected_label
+                        self.events.record(stream_id, detected_label, confidence, clip_path=clip_path)
                 else:
-                    print("No pose detected")
+                    log_event("no_pose", logging.DEBUG, key=stream_id, stream=stream_id)
 
-                # Draw Grid
-                h, w, _ = frame.shape
-                step_size = 50
-                for x in range(0, w, step_size):
-                    cv2.line(frame, (x, 0), (x, h), (200, 200, 200), 1)
-                for y in range(0, h, step_size):
-                    cv2.line(frame, (0, y), (w, y), (200, 200, 200), 1)
-                
-                # Chuyển đổi frame sang dạng grayscale và hiển thị
-                frame = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-                qimg = QImage(frame.data, frame.shape[1], frame.shape[0], frame.strides[0], QImage.Format_Grayscale8)
-                self.video_label.setPixmap(QPixmap.fromImage(qimg))
-                
-                # Kiểm tra xem frame có hiển thị thành công không
-                if self.video_label.pixmap() is None:
-                    print("Lỗi: Không hiển thị được hình ảnh trên QLabel")
+                # Only draw and convert frames that will actually be displayed
+                if self.renderer.ready():
+                    with metrics.timer("stage_seconds", stage="render", stream=stream_id):
+                        if results.pose_landmarks:
+                            mp_drawing.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+                        self.renderer.submit(frame)
                     
-            else:
-                print("Lỗi: Không đọc được frame từ stream")
-                break
-        cap.release()
-        print("Stream đã kết thúc.")
+        supervisor.stop()
+        pipeline.close()
+        clip_buffer.flush()
+        log.info(f"event=stream_ended stream={stream_id} frames={supervisor.frames} dropped={supervisor.dropped} "
+                 f"reconnects={supervisor.reconnects} pose_processed={pipeline.gate.processed} pose_skipped={pipeline.gate.skipped}")
     
     def closeEvent(self, event):
+        for supervisor in self.supervisors:
+            supervisor.stop()
+        # Let each stream loop record its last detection and flush its clip before the writers exit
+        deadline = time.monotonic() + 5
+        for thread in self.stream_threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self.events.close()
+        self.clips.close()
         self.conn.close()
         event.accept()
         
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if METRICS_PORT:
+        profiler = SamplingProfiler(PROFILE_MS / 1000).start() if PROFILE_MS > 0 else None
+        serve(METRICS_PORT, profiler=profiler)
     app = QApplication(sys.argv)
-    window = PoseStreamApp()
-    window.show()
+    with model_cache.timed("window"):
+        window = PoseStreamApp()
+        window.show()
+    # Import mediapipe and load + warm up the model while the window is idle; the first
+    # display_stream waits for this load instead of starting its own
+    model_cache.preload(load_inference)
     sys.exit(app.exec_())
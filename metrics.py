@@ -0,0 +1,209 @@
+import sys
+import time
+import bisect
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets in seconds, from sub-millisecond landmark copies to slow RTSP reads
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+log = logging.getLogger("pose")
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Process-wide counters and latency histograms, rendered as Prometheus text.
+
+    Series are keyed by name plus ``label=value`` keyword arguments, e.g.
+    ``metrics.inc("frames_total", stream=3)``. Updates take one lock and a
+    dict lookup, so they are cheap enough for every frame.
+    """
+
+    def __init__(self, prefix="pose_"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.help = {}
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, (list(h.counts), h.sum, h.count, h.buckets))
+                                for key, h in self.histograms.items())
+        seen = set()
+        for (name, labels), value in counters:
+            metric = self.prefix + name
+            if metric not in seen:
+                seen.add(metric)
+                if name in self.help:
+                    lines.append(f"# HELP {metric} {self.help[name]}")
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_label_text(labels)} {value}")
+        for (name, labels), (counts, total, count, buckets) in histograms:
+            metric = self.prefix + name
+            if metric not in seen:
+                seen.add(metric)
+                if name in self.help:
+                    lines.append(f"# HELP {metric} {self.help[name]}")
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, n in zip(list(buckets) + ["+Inf"], counts):
+                cumulative += n
+                lines.append(f"{metric}_bucket{_label_text(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{metric}_sum{_label_text(labels)} {total}")
+            lines.append(f"{metric}_count{_label_text(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class SamplingProfiler:
+    """Samples the Python stack of every thread ``interval`` seconds on a background thread.
+
+    Only the innermost ``depth`` frames are kept, so the cost is a few
+    microseconds per sample regardless of how busy the stream threads are.
+    """
+
+    def __init__(self, interval=0.01, depth=3):
+        self.interval = interval
+        self.depth = depth
+        self.samples = Counter()
+        self.total = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.depth:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.samples[" <- ".join(stack)] += 1
+                self.total += 1
+
+    def report(self, top=25):
+        lines = [f"{self.total} samples every {self.interval * 1000:.0f} ms"]
+        for stack, count in self.samples.most_common(top):
+            lines.append(f"{count / max(self.total, 1):6.1%}  {stack}")
+        return "\n".join(lines) + "\n"
+
+    def stop(self):
+        self._stop.set()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    registry = metrics
+    profiler = None
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            body = self.registry.render()
+        elif self.path == "/profile" and self.profiler is not None:
+            body = self.profiler.report()
+        else:
+            self.send_error(404)
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port=9100, host="127.0.0.1", registry=metrics, profiler=None):
+    """Serve ``GET /metrics`` (and ``/profile`` with a profiler) on a daemon thread."""
+    handler = type("MetricsHandler", (_Handler,), {"registry": registry, "profiler": profiler})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class RateLimitedLog:
+    """Structured ``event key=value ...`` log lines, at most one per key every ``interval`` seconds.
+
+    Suppressed repeats are counted and reported on the next line that gets
+    through, so a per-frame event costs a dict lookup instead of a print.
+    """
+
+    def __init__(self, logger=log, interval=5.0):
+        self.logger = logger
+        self.interval = interval
+        self._last = {}
+        self._suppressed = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, event, level=logging.INFO, key=None, **fields):
+        key = (event, key)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last.get(key, -self.interval) < self.interval:
+                self._suppressed[key] += 1
+                return
+            self._last[key] = now
+            suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            fields["suppressed"] = suppressed
+        self.logger.log(level, " ".join([f"event={event}"] + [f"{k}={v}" for k, v in fields.items()]))
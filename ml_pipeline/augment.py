@@ -0,0 +1,146 @@
+import numpy as np
+
+NUM_LANDMARKS = 33
+VALUES_PER_LANDMARK = 4  # x, y, z, visibility
+
+# MediaPipe Pose landmark that each landmark becomes when the image is mirrored
+MIRROR_LANDMARKS = np.array([
+    0, 4, 5, 6, 1, 2, 3, 8, 7, 10, 9, 12, 11, 14, 13, 16, 15,
+    18, 17, 20, 19, 22, 21, 24, 23, 26, 25, 28, 27, 30, 29, 32, 31,
+])
+
+
+def _landmarks(x):
+    """View a ``(batch, frames, 132)`` array as ``(batch, frames, 33, 4)``."""
+    return x.reshape(x.shape[:2] + (NUM_LANDMARKS, VALUES_PER_LANDMARK))
+
+
+def resample(frames, length=100):
+    """Linearly resample a ``(frames, features)`` recording to ``length`` frames."""
+    frames = np.asarray(frames, dtype=np.float32)
+    positions = np.linspace(0, len(frames) - 1, length)
+    lo = np.minimum(positions.astype(int), len(frames) - 2) if len(frames) > 1 else np.zeros(length, int)
+    hi = np.minimum(lo + 1, len(frames) - 1)
+    frac = (positions - lo)[:, None].astype(np.float32)
+    return frames[lo] * (1 - frac) + frames[hi] * frac
+
+
+def same_class_partners(y, rng):
+    """For each sample, a random other sample with the same label (itself if it is alone)."""
+    n = len(y)
+    order = np.lexsort((rng.random(n), y))
+    sorted_y = y[order]
+    positions = np.arange(n)
+    starts = np.r_[True, sorted_y[1:] != sorted_y[:-1]]
+    ends = np.r_[starts[1:], True]
+    group_start = np.maximum.accumulate(np.where(starts, positions, 0))
+    nxt = np.where(ends, group_start, positions + 1)
+    partners = np.empty(n, dtype=int)
+    partners[order] = order[nxt]
+    return partners
+
+
+def interpolate(x, y, rng, low=0.3, high=0.7):
+    """Blend every sample with another of its class, ``alpha * a + (1 - alpha) * b``."""
+    alpha = rng.uniform(low, high, (len(x), 1, 1)).astype(np.float32)
+    return alpha * x + (1 - alpha) * x[same_class_partners(y, rng)]
+
+
+def time_warp(x, rng, sigma=0.2, knots=4):
+    """Resample each sequence along a smooth random monotonic time axis."""
+    n, t = x.shape[:2]
+    speeds = np.clip(rng.normal(1.0, sigma, (n, knots + 2)), 0.1, None)
+    # Upsample the knot speeds to one per frame, then integrate into positions
+    grid = np.linspace(0, knots + 1, t)
+    lo = np.minimum(grid.astype(int), knots)
+    frac = grid - lo
+    speeds = speeds[:, lo] * (1 - frac) + speeds[:, lo + 1] * frac
+    warped = np.cumsum(speeds, axis=1)
+    warped = (warped - warped[:, :1]) / (warped[:, -1:] - warped[:, :1]) * (t - 1)
+    lo = np.minimum(warped.astype(int), t - 2)
+    frac = (warped - lo)[..., None].astype(np.float32)
+    return (np.take_along_axis(x, lo[..., None], axis=1) * (1 - frac)
+            + np.take_along_axis(x, lo[..., None] + 1, axis=1) * frac)
+
+
+def jitter(x, rng, sigma=0.005):
+    """Add Gaussian noise to x, y and z (visibility is left alone)."""
+    out = x.copy()
+    coords = _landmarks(out)[..., :3]
+    coords += rng.normal(0, sigma, coords.shape).astype(np.float32)
+    return out
+
+
+def scale(x, rng, low=0.85, high=1.15):
+    """Scale each skeleton about its mean x/y position by a random factor."""
+    out = x.copy()
+    coords = _landmarks(out)[..., :3]
+    factor = rng.uniform(low, high, (len(x), 1, 1, 1)).astype(np.float32)
+    center = coords[..., :2].mean(axis=(1, 2), keepdims=True)
+    coords[..., :2] = (coords[..., :2] - center) * factor + center
+    coords[..., 2:] *= factor
+    return out
+
+
+def mirror(x):
+    """Flip horizontally: ``x -> 1 - x`` and swap left/right landmarks."""
+    out = _landmarks(x)[:, :, MIRROR_LANDMARKS].copy()
+    out[..., 0] = 1 - out[..., 0]
+    return out.reshape(x.shape)
+
+
+def frame_dropout(x, rng, rate=0.1):
+    """Replace random frames with the last kept one, like a stalled camera or skipped pose."""
+    n, t = x.shape[:2]
+    keep = rng.random((n, t)) >= rate
+    keep[:, 0] = True
+    source = np.maximum.accumulate(np.where(keep, np.arange(t), 0), axis=1)
+    return np.take_along_axis(x, source[..., None], axis=1)
+
+
+class Augmenter:
+    """Random augmentation of whole ``(batch, frames, 132)`` landmark batches.
+
+    Each transform is applied to a random subset of the batch, chosen with
+    its own probability, and all of them work on the subset as one array.
+    An instance is a ``transform(x, y, rng)`` for ``dataset.batches`` and
+    ``dataset.tf_dataset``, so every epoch sees fresh samples of every class
+    without anything written to disk.
+    """
+
+    def __init__(self, interpolate=0.5, time_warp=0.5, jitter=0.5, scale=0.5, mirror=0.5, dropout=0.3):
+        self.p_interpolate = interpolate
+        self.p_time_warp = time_warp
+        self.p_jitter = jitter
+        self.p_scale = scale
+        self.p_mirror = mirror
+        self.p_dropout = dropout
+
+    def __call__(self, x, y, rng=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        x = np.array(x, dtype=np.float32)
+        y = np.asarray(y)
+
+        def pick(p):
+            return rng.random(len(x)) < p
+
+        # Blend first, while partners are still the original samples
+        selected = pick(self.p_interpolate)
+        if selected.any():
+            x[selected] = interpolate(x, y, rng)[selected]
+        selected = pick(self.p_time_warp)
+        if selected.any():
+            x[selected] = time_warp(x[selected], rng)
+        selected = pick(self.p_scale)
+        if selected.any():
+            x[selected] = scale(x[selected], rng)
+        selected = pick(self.p_mirror)
+        if selected.any():
+            x[selected] = mirror(x[selected])
+        selected = pick(self.p_dropout)
+        if selected.any():
+            x[selected] = frame_dropout(x[selected], rng)
+        selected = pick(self.p_jitter)
+        if selected.any():
+            x[selected] = jitter(x[selected], rng)
+        return x, y
@@ -0,0 +1,143 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DATA_DIRS = {
+    "falling": 0,
+    "sitting": 1,
+    "standing": 2,
+}
+BASE_PATH = "increase_data"
+CACHE_DIR = ".dataset_cache"
+SAMPLE_SHAPE = (100, 132)
+
+
+def scan_files(base_path=BASE_PATH, data_dirs=DATA_DIRS):
+    """List ``(path, label, mtime_ns, size)`` for every sample file, in a stable order."""
+    files = []
+    for category, label in data_dirs.items():
+        folder_path = os.path.join(base_path, category)
+        for file in sorted(os.listdir(folder_path)):
+            file_path = os.path.join(folder_path, file)
+            stat = os.stat(file_path)
+            files.append((file_path, label, stat.st_mtime_ns, stat.st_size))
+    return files
+
+
+def cache_key(files, sample_shape=SAMPLE_SHAPE):
+    digest = hashlib.sha1(json.dumps([list(sample_shape)] + [list(f) for f in files]).encode())
+    return digest.hexdigest()[:16]
+
+
+def load_sample(path, sample_shape=SAMPLE_SHAPE):
+    """Read and validate one sample; returns ``(array or None, reason)``."""
+    from landmark_store import read_landmark_csv
+
+    if os.stat(path).st_size == 0:
+        return None, "empty file"
+    try:
+        data = read_landmark_csv(path)
+    except Exception as e:
+        return None, str(e)
+    if data.shape != tuple(sample_shape):
+        return None, f"incorrect shape {data.shape}"
+    return data, None
+
+
+def load_dataset(base_path=BASE_PATH, data_dirs=DATA_DIRS, cache_dir=CACHE_DIR, workers=None,
+                 sample_shape=SAMPLE_SHAPE):
+    """Return ``(X, y)`` for every valid sample below ``base_path``.
+
+    Files are parsed in parallel by a process pool and packed into a
+    float32 ``X.npy`` in ``cache_dir``, keyed on the file list, sizes and
+    mtimes. Later runs memory-map that copy directly, so ``X`` is an
+    ``np.memmap`` that never has to fit in RAM.
+    """
+    files = scan_files(base_path, data_dirs)
+    cache_path = os.path.join(cache_dir, cache_key(files, sample_shape))
+    x_path = os.path.join(cache_path, "X.npy")
+    y_path = os.path.join(cache_path, "y.npy")
+    if os.path.exists(x_path) and os.path.exists(y_path):
+        return np.load(x_path, mmap_mode="r"), np.load(y_path)
+    if not files:
+        raise ValueError("No valid data found. Check your files!")
+
+    os.makedirs(cache_path, exist_ok=True)
+    paths = [f[0] for f in files]
+    tmp_path = x_path + ".tmp.npy"
+    X = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(len(files),) + tuple(sample_shape))
+    y = []
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(paths) // (4 * workers))
+        results = pool.map(load_sample, paths, [sample_shape] * len(paths), chunksize=chunksize)
+        for (path, label, _, _), (data, reason) in zip(files, results):
+            if data is None:
+                print(f"Skipping {path}: {reason}")
+                continue
+            X[len(y)] = data
+            y.append(label)
+    if not y:
+        raise ValueError("No valid data found. Check your files!")
+    X.flush()
+    del X
+    if len(y) < len(files):
+        # Drop the unused tail left by skipped files
+        full = np.load(tmp_path, mmap_mode="r")
+        packed = np.lib.format.open_memmap(x_path, mode="w+", dtype=np.float32, shape=(len(y),) + tuple(sample_shape))
+        packed[:] = full[:len(y)]
+        packed.flush()
+        del full, packed
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, x_path)
+    np.save(y_path, np.array(y, dtype=np.int64))
+    return np.load(x_path, mmap_mode="r"), np.load(y_path)
+
+
+def split_indices(y, test_size=0.2, val_size=0.2, random_state=42):
+    """Train/val/test index split matching the notebook (stratified test split)."""
+    from sklearn.model_selection import train_test_split
+
+    indices = np.arange(len(y))
+    train_idx, test_idx = train_test_split(indices, test_size=test_size, random_state=random_state, stratify=y)
+    train_idx, val_idx = train_test_split(train_idx, test_size=val_size, random_state=random_state)
+    return train_idx, val_idx, test_idx
+
+
+def batches(X, y, indices, batch_size=64, shuffle=True, seed=None, transform=None):
+    """Yield ``(x, y)`` batches for one epoch, reading only the rows each batch needs.
+
+    ``transform(x, y, rng)`` can modify each batch (e.g. augmentation).
+    """
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(indices) if shuffle else np.asarray(indices)
+    for start in range(0, len(order), batch_size):
+        # Sorted gathers keep memmap reads sequential
+        batch_idx = np.sort(order[start:start + batch_size])
+        xb = np.asarray(X[batch_idx], dtype=np.float32)
+        yb = np.asarray(y[batch_idx])
+        if transform is not None:
+            xb, yb = transform(xb, yb, rng)
+        yield xb, yb
+
+
+def tf_dataset(X, y, indices, batch_size=64, shuffle=True, transform=None, prefetch=2):
+    """``tf.data`` pipeline over ``batches``; reshuffled on every epoch."""
+    import tensorflow as tf
+
+    epoch = [0]
+
+    def generator():
+        epoch[0] += 1
+        seed = epoch[0] if shuffle else None
+        yield from batches(X, y, indices, batch_size, shuffle, seed, transform)
+
+    signature = (
+        tf.TensorSpec((None,) + X.shape[1:], tf.float32),
+        tf.TensorSpec((None,), tf.int64),
+    )
+    return tf.data.Dataset.from_generator(generator, output_signature=signature).prefetch(prefetch)
@@ -1,4 +1,6 @@
+import os
 import sys
+from collections import deque
 import cv2
 import mediapipe as mp
 import numpy as np
@@ -6,7 +8,15 @@ from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QVBoxLayout
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QImage, QPixmap, QFont
 from PyQt5.QtCore import QTimer
-from keras.models import load_model
+from inference_backends import load_backend
+from features import extract_landmarks, load_scaler
+
+# Model file and runtime; POSE_BACKEND is keras, tflite or onnx (guessed from the extension if unset)
+MODEL_PATH = os.environ.get("POSE_MODEL", "./model.h5")
+INFERENCE_BACKEND = os.environ.get("POSE_BACKEND") or None
+# Window length the model is exported with (export_model.NO_OF_TIMESTEPS, main.py's window)
+NO_OF_TIMESTEPS = 100
+PREDICT_EVERY = 10  # frames between predictions once the window is full
 
 
 class PoseCaptureApp(QWidget):
@@ -14,7 +24,8 @@ class PoseCaptureApp(QWidget):
         super().__init__()
         self.setWindowTitle("Pose Detection")
         self.setGeometry(100, 100, 800, 600)
-        self.model = load_model('./model.h5')
+        self.model = load_backend(MODEL_PATH, INFERENCE_BACKEND)
+        self.scaler = load_scaler()  # POSE_SCALER, must match the model's training features
         
         # UI Components
         self.video_label = QLabel(self)
@@ -40,7 +51,8 @@ class PoseCaptureApp(QWidget):
         self.pose = self.mp_pose.Pose()
         self.mp_draw = mp.solutions.drawing_utils
 
-        self.lm_list = []
+        self.lm_list = deque(maxlen=NO_OF_TIMESTEPS)
+        self.new_frames = 0
         self.capture_active = False
 
     def update_frame(self):
@@ -52,8 +64,9 @@ class PoseCaptureApp(QWidget):
             if results.pose_landmarks:
                 self.mp_draw.draw_landmarks(frame, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS)
                 self.lm_list.append(self.extract_landmarks(results))
-                
-                if len(self.lm_list) == 10:  # Fixed the condition check here
+                self.new_frames += 1
+
+                if len(self.lm_list) == NO_OF_TIMESTEPS and self.new_frames >= PREDICT_EVERY:
                     self.start_detect()
                     
             gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
@@ -61,15 +74,12 @@ class PoseCaptureApp(QWidget):
             self.video_label.setPixmap(QPixmap.fromImage(image))
 
     def extract_landmarks(self, results):
-        landmarks = []
-        for lm in results.pose_landmarks.landmark:
-            landmarks.extend([lm.x, lm.y, lm.z, lm.visibility])
-        return landmarks
+        return extract_landmarks(results, scaler=self.scaler)
 
     def start_detect(self):
-        df_data = np.array(self.lm_list[:100])  # Only keep the last 10 frames
-        df_data = np.expand_dims(df_data, axis=0)
-        self.lm_list = []  # Clear the list after processing
+        # Sliding window of the last NO_OF_TIMESTEPS frames, the fixed input length of exported models
+        df_data = np.expand_dims(np.array(self.lm_list, dtype=np.float32), axis=0)
+        self.new_frames = 0
         prediction = self.model.predict(df_data)
         label = np.argmax(prediction)
         labels = ["Falling", "Sitting", "Standing"]
@@ -0,0 +1,123 @@
+import os
+import sys
+import glob
+import argparse
+
+import numpy as np
+import tensorflow as tf
+from keras.models import load_model
+
+from inference_backends import load_backend
+
+NO_OF_TIMESTEPS = 100
+NUM_FEATURES = 132
+
+
+def calibration_windows(path=None, count=100, seed=0):
+    """Windows used for int8 calibration and the parity check.
+
+    ``path`` is a ``.npy`` array of shape ``(n, 100, 132)``; without it,
+    random windows in the landmark value range are used.
+    """
+    if path:
+        return np.load(path).astype(np.float32)[:count]
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0.0, 1.0, (count, NO_OF_TIMESTEPS, NUM_FEATURES)).astype(np.float32)
+
+
+def export_tflite(model, output_path, quantize=None, calibration=None):
+    # Dynamic batch dimension: TFLiteBackend resizes the input so a micro-batch runs in one invoke.
+    # The time axis stays fixed at NO_OF_TIMESTEPS, so callers must feed 100-frame windows.
+    run_model = tf.function(lambda x: model(x, training=False))
+    concrete = run_model.get_concrete_function(tf.TensorSpec([None, NO_OF_TIMESTEPS, NUM_FEATURES], tf.float32))
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([concrete], model)
+    if quantize == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantize == "int8":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if calibration is not None:
+            # Full integer weights/activations; inputs and outputs stay float32
+            def representative_dataset():
+                for window in calibration:
+                    yield [window[np.newaxis]]
+            converter.representative_dataset = representative_dataset
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+
+
+def export_onnx(model, output_path, quantize=None):
+    import tf2onnx
+
+    spec = (tf.TensorSpec((None, NO_OF_TIMESTEPS, NUM_FEATURES), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=output_path)
+    if quantize == "int8":
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(output_path, output_path, weight_type=QuantType.QInt8)
+    elif quantize == "float16":
+        import onnx
+        from onnxconverter_common import float16
+
+        fp16_model = float16.convert_float_to_float16(onnx.load(output_path), keep_io_types=True)
+        onnx.save(fp16_model, output_path)
+
+
+def parity_check(model, exported_path, windows, tolerance):
+    """Compare the exported model against Keras; returns (max_abs_diff, label_agreement)."""
+    expected = np.asarray(model.predict_on_batch(windows))
+    actual = load_backend(exported_path).predict(windows)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    agreement = float(np.mean(np.argmax(expected, axis=1) == np.argmax(actual, axis=1)))
+    status = "OK" if max_diff <= tolerance else "FAILED"
+    print(f"  parity {status}: max |diff| = {max_diff:.5f}, label agreement = {agreement:.2%}")
+    return max_diff, agreement
+
+
+def default_models():
+    models = ["model.h5"]
+    checkpoints = sorted(glob.glob("best_model_epoch_*.keras"))
+    if checkpoints:
+        models.append(checkpoints[-1])
+    return models
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the fall classifier to TFLite and/or ONNX")
+    parser.add_argument("models", nargs="*", help="Keras models (default: model.h5 and the latest best_model_epoch_*.keras)")
+    parser.add_argument("--format", choices=["tflite", "onnx", "all"], default="all")
+    parser.add_argument("--quantize", choices=["none", "float16", "int8"], default="none")
+    parser.add_argument("--calibration", help=".npy of (n, 100, 132) windows for int8 calibration and parity checks")
+    parser.add_argument("--output-dir", default="exported")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="max allowed |diff| against Keras (default depends on quantization)")
+    args = parser.parse_args(argv)
+
+    quantize = None if args.quantize == "none" else args.quantize
+    tolerance = args.tolerance
+    if tolerance is None:
+        tolerance = {None: 1e-4, "float16": 1e-2, "int8": 5e-2}[quantize]
+    formats = ["tflite", "onnx"] if args.format == "all" else [args.format]
+    windows = calibration_windows(args.calibration)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    failed = False
+    for model_path in args.models or default_models():
+        model = load_model(model_path)
+        stem = os.path.splitext(os.path.basename(model_path))[0]
+        suffix = f"_{quantize}" if quantize else ""
+        for fmt in formats:
+            output_path = os.path.join(args.output_dir, f"{stem}{suffix}.{fmt}")
+            if fmt == "tflite":
+                export_tflite(model, output_path, quantize, windows if args.calibration else None)
+            else:
+                export_onnx(model, output_path, quantize)
+            size_kb = os.path.getsize(output_path) / 1024
+            print(f"Exported {model_path} -> {output_path} ({size_kb:.0f} KB)")
+            max_diff, _ = parity_check(model, output_path, windows, tolerance)
+            failed = failed or max_diff > tolerance
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
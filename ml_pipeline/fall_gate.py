@@ -0,0 +1,146 @@
+import sys
+import argparse
+import itertools
+
+import numpy as np
+
+# Mediapipe Pose landmark indices
+TORSO_LANDMARKS = (11, 12, 23, 24)  # shoulders and hips
+FALLING = 0  # label index of "Falling" in the model output and in dataset.DATA_DIRS
+
+
+def torso_height(windows):
+    """Mean y of shoulders and hips for ``(..., timesteps, 132)`` windows (y grows downwards)."""
+    return windows[..., [i * 4 + 1 for i in TORSO_LANDMARKS]].mean(axis=-1)
+
+
+def aspect_ratio(windows):
+    """Width / height of the landmark bounding box per frame."""
+    x = windows[..., 0::4]
+    y = windows[..., 1::4]
+    width = x.max(axis=-1) - x.min(axis=-1)
+    height = y.max(axis=-1) - y.min(axis=-1)
+    return width / np.maximum(height, 1e-3)
+
+
+def geometry(windows, horizon=30, lag=5):
+    """Fall cues over the last ``horizon`` frames of ``(..., timesteps, 132)`` windows.
+
+    Returns ``(velocity, aspect_change, aspect)``: the fastest downward
+    torso movement in image heights per frame (measured over ``lag``
+    frames), the range of the bounding-box aspect ratio, and the aspect
+    ratio of the newest frame. All three are ``(...)`` arrays, so a whole
+    dataset is scored in one call.
+    """
+    recent = np.asarray(windows, dtype=np.float32)[..., -horizon:, :]
+    height = torso_height(recent)
+    lag = min(lag, height.shape[-1] - 1)
+    velocity = ((height[..., lag:] - height[..., :-lag]) / lag).max(axis=-1)
+    aspect = aspect_ratio(recent)
+    return velocity, aspect.max(axis=-1) - aspect.min(axis=-1), aspect[..., -1]
+
+
+class FallGate:
+    """Cheap geometric check in front of the LSTM: is a fall plausible in this window?
+
+    The gate fires when the torso drops faster than ``velocity`` image
+    heights per frame, when the bounding-box aspect ratio swings by more than
+    ``aspect_change`` (upright to lying or back), or while the body is wider
+    than ``lying_aspect`` times its height. A person standing or sitting still
+    trips none of these, so the LSTM only runs while something is happening.
+    Thresholds are per frame and therefore depend on the capture rate; check
+    them against recorded data with ``python fall_gate.py``. Pass the
+    ``scaler`` the windows were scaled with so the geometry is measured on
+    raw image coordinates.
+    """
+
+    def __init__(self, velocity=0.01, aspect_change=0.3, lying_aspect=1.0, horizon=30, lag=5, scaler=None):
+        self.velocity = velocity
+        self.aspect_change = aspect_change
+        self.lying_aspect = lying_aspect
+        self.horizon = horizon
+        self.lag = lag
+        self.scaler = scaler
+        self.checked = 0
+        self.fired = 0
+
+    def plausible(self, windows):
+        """Vectorized gate decision for ``(..., timesteps, 132)`` windows."""
+        if self.scaler is not None:
+            windows = (np.asarray(windows, dtype=np.float32)[..., -self.horizon:, :] - self.scaler.offset) \
+                / self.scaler.scale
+        velocity, aspect_change, aspect = geometry(windows, self.horizon, self.lag)
+        return (velocity > self.velocity) | (aspect_change > self.aspect_change) | (aspect > self.lying_aspect)
+
+    def __call__(self, window):
+        fired = bool(self.plausible(window))
+        self.checked += 1
+        self.fired += fired
+        return fired
+
+    def fire_rate(self):
+        return self.fired / self.checked if self.checked else 0.0
+
+
+def evaluate(predictions, labels, fired):
+    """Compare the cascade against running the LSTM on every window.
+
+    ``predictions`` are LSTM class indices, ``labels`` the ground truth and
+    ``fired`` the gate decisions. Recall is measured both against the
+    LSTM's own Falling calls and against labelled falls.
+    """
+    lstm_falls = predictions == FALLING
+    true_falls = labels == FALLING
+    cascade_falls = lstm_falls & fired
+    return {
+        "fire_rate": float(fired.mean()),
+        "recall_vs_lstm": float(cascade_falls.sum() / max(lstm_falls.sum(), 1)),
+        "lstm_recall": float((lstm_falls & true_falls).sum() / max(true_falls.sum(), 1)),
+        "cascade_recall": float((cascade_falls & true_falls).sum() / max(true_falls.sum(), 1)),
+    }
+
+
+def main(argv=None):
+    from dataset import BASE_PATH, load_dataset
+    from features import load_scaler
+    from inference_backends import load_backend
+
+    parser = argparse.ArgumentParser(description="Fire rate and recall of the geometric fall gate on recorded windows")
+    parser.add_argument("--data", default=BASE_PATH, help="sample tree with falling/sitting/standing folders")
+    parser.add_argument("--model", default="model.h5")
+    parser.add_argument("--backend", choices=["keras", "tflite", "onnx"], default=None)
+    parser.add_argument("--scaler", default=None, help="feature scaler the model was trained with")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--velocity", type=float, nargs="+", default=[0.01])
+    parser.add_argument("--aspect-change", type=float, nargs="+", default=[0.3])
+    parser.add_argument("--lying-aspect", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--horizon", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    X, y = load_dataset(args.data)
+    model = load_backend(args.model, args.backend)
+    scaler = load_scaler(args.scaler)
+    # The LSTM runs once over everything; each threshold combination only re-scores the geometry
+    predictions = np.empty(len(X), dtype=np.int64)
+    for start in range(0, len(X), args.batch_size):
+        batch = np.asarray(X[start:start + args.batch_size], dtype=np.float32)
+        if scaler is not None:
+            batch = scaler.transform(batch)
+        predictions[start:start + len(batch)] = model.predict(batch).argmax(axis=-1)
+
+    print(f"{len(X)} windows, {int((y == FALLING).sum())} labelled falls, "
+          f"{int((predictions == FALLING).sum())} LSTM Falling calls")
+    print("velocity  aspect_change  lying_aspect  fire_rate  recall_vs_lstm  lstm_recall  cascade_recall")
+    for velocity, aspect_change, lying_aspect in itertools.product(args.velocity, args.aspect_change,
+                                                                  args.lying_aspect):
+        gate = FallGate(velocity, aspect_change, lying_aspect, args.horizon)
+        fired = np.concatenate([gate.plausible(X[start:start + args.batch_size])
+                                for start in range(0, len(X), args.batch_size)])
+        result = evaluate(predictions, y, fired)
+        print(f"{velocity:8.4f}  {aspect_change:13.2f}  {lying_aspect:12.2f}  {result['fire_rate']:9.1%}  "
+              f"{result['recall_vs_lstm']:14.1%}  {result['lstm_recall']:11.1%}  {result['cascade_recall']:14.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
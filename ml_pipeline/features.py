@@ -0,0 +1,135 @@
+import os
+
+import numpy as np
+
+NUM_LANDMARKS = 33
+NUM_FEATURES = NUM_LANDMARKS * 4  # x, y, z, visibility per landmark
+
+# Opt-in: the shipped model.h5 was trained on raw landmarks, not on scaler.pkl output
+SCALER_PATH = os.environ.get("POSE_SCALER")
+
+
+class AffineScaler:
+    """A fitted feature scaler reduced to ``x * scale + offset`` on float32 arrays."""
+
+    def __init__(self, scale, offset):
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.offset = np.asarray(offset, dtype=np.float32)
+
+    @classmethod
+    def from_sklearn(cls, scaler, num_features=NUM_FEATURES):
+        """Fold a fitted ``MinMaxScaler`` or ``StandardScaler`` into an affine map.
+
+        A scaler fitted on fewer columns (scaler.pkl was fitted on 131, after
+        train_ltsm.py dropped the first one) covers the trailing columns and
+        leaves the leading ones unchanged.
+        """
+        if hasattr(scaler, "min_"):
+            scale, offset = scaler.scale_, scaler.min_
+        else:
+            scale = 1.0 / scaler.scale_ if scaler.scale_ is not None else np.ones(scaler.n_features_in_)
+            offset = -scaler.mean_ * scale if scaler.mean_ is not None else np.zeros(scaler.n_features_in_)
+        full_scale = np.ones(num_features, dtype=np.float32)
+        full_offset = np.zeros(num_features, dtype=np.float32)
+        full_scale[num_features - len(scale):] = scale
+        full_offset[num_features - len(offset):] = offset
+        return cls(full_scale, full_offset)
+
+    def apply(self, features):
+        """Scale a ``(..., num_features)`` float32 array in place and return it."""
+        features *= self.scale
+        features += self.offset
+        return features
+
+    def transform(self, x, y=None, rng=None):
+        """Scaled copy of ``x``; also usable as a ``dataset.batches`` transform."""
+        x = np.array(x, dtype=np.float32)
+        return self.apply(x) if y is None else (self.apply(x), y)
+
+    def save(self, path):
+        np.savez(path, scale=self.scale, offset=self.offset)
+
+
+def load_scaler(path=SCALER_PATH):
+    """Load ``path`` (an sklearn scaler saved with joblib, or a saved ``.npz``); None if no path."""
+    if not path:
+        return None
+    if path.endswith(".npz"):
+        data = np.load(path)
+        return AffineScaler(data["scale"], data["offset"])
+    # scaler.pkl was written by joblib.dump; plain pickle cannot rebuild its numpy records
+    import joblib
+
+    return AffineScaler.from_sklearn(joblib.load(path))
+
+
+def extract_landmarks(results, out=None, scaler=None):
+    """Write the pose landmarks of mediapipe ``results`` into a float32 ``(132,)`` array.
+
+    ``out`` is filled in place when given (missing landmarks are zeroed), so
+    a per-stream buffer avoids an allocation per frame. Returns None when no
+    pose was detected.
+    """
+    if not results.pose_landmarks:
+        return None
+    if out is None:
+        out = np.empty(NUM_FEATURES, dtype=np.float32)
+    values = [v for lm in results.pose_landmarks.landmark[:NUM_LANDMARKS]
+              for v in (lm.x, lm.y, lm.z, lm.visibility)]
+    out[:len(values)] = values
+    out[len(values):] = 0.0
+    if scaler is not None:
+        scaler.apply(out)
+    return out
+
+
+class FeatureExtractor:
+    """Per-stream landmark extraction into one reused ``(132,)`` buffer.
+
+    The returned array is overwritten by the next call; ``LandmarkWindow``
+    copies it on ``append``.
+    """
+
+    def __init__(self, scaler=None):
+        self.scaler = scaler
+        self.buffer = np.zeros(NUM_FEATURES, dtype=np.float32)
+
+    def __call__(self, results):
+        return extract_landmarks(results, self.buffer, self.scaler)
+
+
+def extract_video(path, start=0, stop=None, inference_width=None):
+    """Run mediapipe Pose over frames ``start..stop`` of a video file, as fast as it decodes.
+
+    Frames wider than ``inference_width`` are downscaled first, as
+    ``PoseGate`` does live. Returns ``(landmarks, detected)``: raw
+    ``(frames, 132)`` float32 landmarks (zero where no pose was found) and a
+    boolean mask of the frames with a pose. ``stop=None`` reads to the end.
+    """
+    import cv2
+    import mediapipe as mp
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open {path}")
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    pose = mp.solutions.pose.Pose()
+    extractor = FeatureExtractor()
+    rows, detected = [], []
+    try:
+        while stop is None or start + len(rows) < stop:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            h, w = frame.shape[:2]
+            if inference_width and w > inference_width:
+                frame = cv2.resize(frame, (inference_width, max(1, round(h * inference_width / w))),
+                                   interpolation=cv2.INTER_AREA)
+            landmarks = extractor(pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+            detected.append(landmarks is not None)
+            rows.append(landmarks.copy() if landmarks is not None else np.zeros(NUM_FEATURES, dtype=np.float32))
+    finally:
+        cap.release()
+        pose.close()
+    return np.array(rows, dtype=np.float32).reshape(-1, NUM_FEATURES), np.array(detected, dtype=bool)
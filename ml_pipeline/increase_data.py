@@ -1,41 +1,52 @@
 import os
+import glob
+import argparse
+
 import numpy as np
-import pandas as pd
+
+from augment import Augmenter, resample
+from landmark_store import LABELS, read_landmark_csv
 
 # Paths
 input_dir = "data"
-output_dir = "increase_data/sitting"
-
-# Ensure output directory exists
-os.makedirs(output_dir, exist_ok=True)
-
-# Load existing data files
-existing_files = [f"data_sitting_{i}.csv" for i in range(1, 7)]
-existing_data = [pd.read_csv(os.path.join(input_dir, file), header=None).values for file in existing_files]
-
-# Function to interpolate between two datasets
-def interpolate_data(data1, data2, alpha=0.5):
-    """Interpolates two time-series data maintaining row-to-row relationships."""
-    return alpha * data1 + (1 - alpha) * data2
-
-# Generate 100 new files
-for i in range(1, 101):
-    # Select two random datasets for interpolation
-    idx1, idx2 = np.random.choice(len(existing_data), 2, replace=False)
-    data1, data2 = existing_data[idx1], existing_data[idx2]
-
-    # Ensure both datasets have the same shape
-    min_rows = min(data1.shape[0], data2.shape[0])  # To avoid shape mismatch
-    data1, data2 = data1[:min_rows], data2[:min_rows]
-
-    # Random interpolation factor
-    alpha = np.random.uniform(0.3, 0.7)  # To introduce more variation
-    new_data = interpolate_data(data1, data2, alpha)
-
-    # Save the new data
-    output_file = os.path.join(output_dir, f"data_sitting_{i}.csv")
-    pd.DataFrame(new_data).to_csv(output_file, header=False, index=False)
-
-    print(f"Generated: {output_file}")
-
-print("Data augmentation complete. 100 files created!")
+output_dir = "increase_data"
+
+
+def load_captures(input_dir, label, length=100):
+    """Every ``data_<label>_N.csv`` capture, resampled to ``length`` frames."""
+    paths = sorted(p for p in glob.glob(os.path.join(input_dir, f"data_{label}_*.csv"))
+                   if not p.endswith("_merged.csv") and os.path.getsize(p) > 0)
+    return np.stack([resample(read_landmark_csv(p), length) for p in paths]) if paths else None
+
+
+def main(argv=None):
+    # Training augments batches on the fly (see augment.Augmenter); this script
+    # only writes a fixed augmented set for tools that still read increase_data/.
+    parser = argparse.ArgumentParser(description="Write augmented copies of the captures in data/")
+    parser.add_argument("--input", default=input_dir)
+    parser.add_argument("--output", default=output_dir)
+    parser.add_argument("--count", type=int, default=100, help="files to generate per class")
+    parser.add_argument("--labels", nargs="*", default=LABELS)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    augmenter = Augmenter(interpolate=1.0)
+    for label in args.labels:
+        captures = load_captures(args.input, label)
+        if captures is None:
+            print(f"No captures for {label} in {args.input}")
+            continue
+        # One vectorized pass generates the whole class
+        sources = captures[rng.integers(len(captures), size=args.count)]
+        generated, _ = augmenter(sources, np.zeros(args.count, dtype=int), rng)
+
+        folder = os.path.join(args.output, label)
+        os.makedirs(folder, exist_ok=True)
+        for i, sample in enumerate(generated, start=1):
+            np.savetxt(os.path.join(folder, f"data_{label}_{i}.csv"), sample, delimiter=",", fmt="%.7g")
+        print(f"Generated {args.count} files from {len(captures)} {label} captures in {folder}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import os
+
+import numpy as np
+
+BACKENDS = ("keras", "tflite", "onnx")
+
+
+def backend_for_path(path):
+    """Guess the backend from a model file extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".h5", ".keras"):
+        return "keras"
+    if ext == ".tflite":
+        return "tflite"
+    if ext == ".onnx":
+        return "onnx"
+    raise ValueError(f"Cannot infer inference backend for {path}")
+
+
+def import_runtime(backend):
+    """Import the runtime behind ``backend`` without loading a model."""
+    if backend == "keras":
+        import keras  # noqa: F401
+    elif backend == "tflite":
+        try:
+            import tflite_runtime.interpreter  # noqa: F401
+        except ImportError:
+            import tensorflow.lite  # noqa: F401
+    elif backend == "onnx":
+        import onnxruntime  # noqa: F401
+
+
+def load_backend(path, backend=None):
+    """Load the fall classifier at ``path`` with the requested interpreter.
+
+    Every backend exposes ``predict(batch)`` taking a float32
+    ``(n, timesteps, features)`` array and returning ``(n, classes)``
+    probabilities. Only the selected runtime is imported.
+    """
+    backend = backend or backend_for_path(path)
+    if backend == "keras":
+        return KerasBackend(path)
+    if backend == "tflite":
+        return TFLiteBackend(path)
+    if backend == "onnx":
+        return OnnxBackend(path)
+    raise ValueError(f"Unknown inference backend: {backend} (expected one of {', '.join(BACKENDS)})")
+
+
+class KerasBackend:
+    name = "keras"
+
+    def __init__(self, path):
+        from keras.models import load_model
+
+        self.model = load_model(path)
+
+    def predict(self, batch):
+        return np.asarray(self.model.predict_on_batch(np.asarray(batch, dtype=np.float32)))
+
+
+class TFLiteBackend:
+    """TFLite interpreter, preferring the standalone ``tflite_runtime`` package."""
+
+    name = "tflite"
+
+    def __init__(self, path, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+
+        self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        # Models exported with a dynamic batch are resized per call; older fixed-batch exports are fed in slices
+        self.dynamic_batch = int(self.input.get("shape_signature", self.input["shape"])[0]) == -1
+        self.batch_size = int(self.input["shape"][0])
+
+    def _quantize(self, batch):
+        if self.input["dtype"] == np.float32:
+            return batch
+        scale, zero_point = self.input["quantization"]
+        return np.round(batch / scale + zero_point).astype(self.input["dtype"])
+
+    def _dequantize(self, output):
+        if self.output["dtype"] == np.float32:
+            return output
+        scale, zero_point = self.output["quantization"]
+        return (output.astype(np.float32) - zero_point) * scale
+
+    def _resize(self, batch_size):
+        if batch_size == self.batch_size:
+            return
+        shape = [batch_size] + [int(d) for d in self.input["shape"][1:]]
+        self.interpreter.resize_tensor_input(self.input["index"], shape)
+        self.interpreter.allocate_tensors()
+        self.batch_size = batch_size
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        if self.dynamic_batch and len(batch):
+            self._resize(len(batch))
+            self.interpreter.set_tensor(self.input["index"], self._quantize(batch))
+            self.interpreter.invoke()
+            return self._dequantize(self.interpreter.get_tensor(self.output["index"]))
+        # Fixed-batch graphs are fed in slices
+        outputs = []
+        for start in range(0, len(batch), self.batch_size):
+            chunk = batch[start:start + self.batch_size]
+            n = len(chunk)
+            if n < self.batch_size:
+                chunk = np.concatenate([chunk, np.zeros((self.batch_size - n,) + chunk.shape[1:], np.float32)])
+            self.interpreter.set_tensor(self.input["index"], self._quantize(chunk))
+            self.interpreter.invoke()
+            outputs.append(self._dequantize(self.interpreter.get_tensor(self.output["index"]))[:n])
+        return np.concatenate(outputs)
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, path, num_threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        return self.session.run(None, {self.input_name: batch})[0]
@@ -0,0 +1,167 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+import threading
+
+import numpy as np
+
+# Shared by every checkout and tool on the machine; entries are content-addressed
+CACHE_DIR = os.environ.get("POSE_LANDMARK_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "pose_landmarks"))
+MAX_BYTES = int(float(os.environ.get("POSE_LANDMARK_CACHE_GB", "4")) * (1 << 30))
+# Bump when the extraction itself changes (frame handling, feature layout)
+EXTRACTOR_VERSION = 1
+
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's content, remembered per (path, size, mtime) within the process."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        if memo_key in _digests:
+            return _digests[memo_key]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    with _digests_lock:
+        _digests[memo_key] = digest.hexdigest()
+    return _digests[memo_key]
+
+
+def pose_version():
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:
+        return "unknown"
+    try:
+        return version("mediapipe")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class LandmarkCache:
+    """Per-frame pose landmarks of video files, keyed by content hash plus pose settings.
+
+    An entry is one uncompressed ``.npz`` with the ``(frames, 132)``
+    landmarks and the per-frame ``detected`` mask, named after
+    ``key(video, **settings)``: the SHA-256 of the video bytes combined with
+    the settings, the mediapipe version and ``EXTRACTOR_VERSION``. Renaming
+    or copying a video keeps its entry; re-encoding it or changing any
+    setting does not. Entries are written to a temporary file and renamed
+    into place, so several processes can share the directory.
+
+    The directory is kept under ``max_bytes`` by deleting the least recently
+    used entries; a hit touches the file's mtime, which serves as the LRU
+    clock.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+    def key(self, video, **settings):
+        settings = dict(settings, pose=pose_version(), extractor=EXTRACTOR_VERSION)
+        text = json.dumps({"video": file_digest(video), "settings": settings}, sort_keys=True)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key + ".npz")
+
+    def get(self, key):
+        """Return ``(landmarks, detected)`` for ``key``, or None on a miss."""
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                landmarks, detected = data["landmarks"], data["detected"]
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            # Missing, evicted by another process in the meantime, or truncated
+            self.misses += 1
+            return None
+        self.hits += 1
+        return landmarks, detected
+
+    def put(self, key, landmarks, detected):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, landmarks=np.asarray(landmarks, dtype=np.float32),
+                 detected=np.asarray(detected, dtype=bool))
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def landmarks(self, video, extract, **settings):
+        """Cached landmarks of ``video``, computing them with ``extract(video, **settings)`` on a miss."""
+        key = self.key(video, **settings)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        landmarks, detected = extract(video, **settings)
+        self.put(key, landmarks, detected)
+        return landmarks, detected
+
+    def entries(self):
+        """``(mtime, size, path)`` of every entry, least recently used first."""
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.endswith(".npz") or filename.endswith(".tmp.npz"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def nbytes(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used entries until the cache fits ``max_bytes``; returns bytes freed."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in entries:
+            if total - freed <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            freed += size
+        return freed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Content-addressed cache of per-frame pose landmarks")
+    parser.add_argument("--root", default=CACHE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("info", help="entry count and size")
+    evict = commands.add_parser("evict", help="shrink the cache to a size limit")
+    evict.add_argument("--max-gb", type=float, default=MAX_BYTES / (1 << 30))
+    commands.add_parser("clear", help="delete every entry")
+    args = parser.parse_args(argv)
+
+    cache = LandmarkCache(args.root)
+    if args.command == "info":
+        entries = cache.entries()
+        print(f"{len(entries)} entries, {sum(size for _, size, _ in entries) / 1e6:.1f} MB in {args.root} "
+              f"(limit {cache.max_bytes / 1e6:.0f} MB)")
+    else:
+        max_bytes = 0 if args.command == "clear" else int(args.max_gb * (1 << 30))
+        print(f"Freed {cache.evict(max_bytes) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
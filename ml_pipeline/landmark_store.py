@@ -0,0 +1,251 @@
+import os
+import re
+import sys
+import json
+import time
+import struct
+import argparse
+
+import numpy as np
+
+STORE_DIR = os.path.join("data", "landmarks")
+NUM_FEATURES = 132
+LABELS = ["falling", "sitting", "standing"]
+SHARD_ROWS = 1 << 18  # ~138 MB of float32 landmarks per shard
+
+# Fixed-size .npy v1 header so the shape can be rewritten in place while appending
+_MAGIC = b"\x93NUMPY\x01\x00"
+_HEADER_LEN = 118  # magic (8) + length field (2) + 118 = 128 bytes, 64-byte aligned
+
+
+def _npy_header(rows, num_features):
+    header = "{'descr': '<f4', 'fortran_order': False, 'shape': (%d, %d), }" % (rows, num_features)
+    header = header.ljust(_HEADER_LEN - 1) + "\n"
+    return _MAGIC + struct.pack("<H", _HEADER_LEN) + header.encode("latin1")
+
+
+class LandmarkStore:
+    """Landmark recordings packed into float32 ``.npy`` shards plus a JSON manifest.
+
+    Each recording is a contiguous ``(frames, 132)`` block inside a shard;
+    ``manifest.json`` lists its name, label, shard, row offset, length and
+    any extra metadata. Shards are plain ``.npy`` files, so ``get`` returns a
+    read-only ``np.memmap`` slice without copying or parsing text.
+    """
+
+    def __init__(self, root=STORE_DIR, num_features=NUM_FEATURES, shard_rows=SHARD_ROWS):
+        self.root = root
+        self.num_features = num_features
+        self.shard_rows = shard_rows
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self._maps = {}
+        os.makedirs(root, exist_ok=True)
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"num_features": num_features, "shards": {}, "recordings": []}
+
+    # Writing
+
+    def save_manifest(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _current_shard(self, rows):
+        shards = self.manifest["shards"]
+        if shards:
+            name = sorted(shards)[-1]
+            if shards[name] + rows <= self.shard_rows or shards[name] == 0:
+                return name
+        name = f"shard_{len(shards):05d}.npy"
+        with open(os.path.join(self.root, name), "wb") as f:
+            f.write(_npy_header(0, self.num_features))
+        shards[name] = 0
+        return name
+
+    def append(self, frames, label, name=None, save=True, **metadata):
+        """Store one recording and return its manifest entry.
+
+        Bulk writers can pass ``save=False`` and call ``save_manifest`` once
+        at the end.
+        """
+        frames = np.ascontiguousarray(frames, dtype="<f4")
+        if frames.ndim != 2 or frames.shape[1] != self.num_features:
+            raise ValueError(f"Expected (frames, {self.num_features}) landmarks, got {frames.shape}")
+        shard = self._current_shard(len(frames))
+        offset = self.manifest["shards"][shard]
+        path = os.path.join(self.root, shard)
+        with open(path, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            f.write(frames.tobytes())
+            f.seek(0)
+            f.write(_npy_header(offset + len(frames), self.num_features))
+        self._maps.pop(shard, None)
+        self.manifest["shards"][shard] = offset + len(frames)
+        entry = {
+            "name": name or self.next_name(label),
+            "label": label,
+            "shard": shard,
+            "offset": offset,
+            "length": len(frames),
+            "created": time.time(),
+        }
+        entry.update(metadata)
+        self.manifest["recordings"].append(entry)
+        if save:
+            self.save_manifest()
+        return entry
+
+    def next_name(self, label):
+        count = sum(1 for entry in self.manifest["recordings"] if entry["label"] == label)
+        return f"data_{label}_{count + 1}"
+
+    def remove(self, name):
+        """Drop a recording from the manifest; its rows stay in the shard."""
+        before = len(self.manifest["recordings"])
+        self.manifest["recordings"] = [e for e in self.manifest["recordings"] if e["name"] != name]
+        self.save_manifest()
+        return len(self.manifest["recordings"]) != before
+
+    # Reading
+
+    def recordings(self, label=None):
+        return [e for e in self.manifest["recordings"] if label is None or e["label"] == label]
+
+    def _shard(self, shard):
+        if shard not in self._maps:
+            self._maps[shard] = np.load(os.path.join(self.root, shard), mmap_mode="r")
+        return self._maps[shard]
+
+    def get(self, entry):
+        """Return a recording (entry dict or name) as a zero-copy ``(frames, 132)`` view."""
+        if isinstance(entry, str):
+            entry = next(e for e in self.manifest["recordings"] if e["name"] == entry)
+        return self._shard(entry["shard"])[entry["offset"]:entry["offset"] + entry["length"]]
+
+    def load_label(self, label):
+        """All frames recorded for ``label``, concatenated in recording order."""
+        arrays = [self.get(e) for e in self.recordings(label)]
+        if not arrays:
+            return np.empty((0, self.num_features), dtype=np.float32)
+        return np.concatenate(arrays)
+
+    def nbytes(self):
+        return sum(os.path.getsize(os.path.join(self.root, shard)) for shard in self.manifest["shards"])
+
+
+def read_landmark_csv(path):
+    """Read a landmark CSV written by make_data.py or increase_data.py.
+
+    make_data.py writes a ``0..131`` header row, the augmented files do not;
+    a first row equal to its own column indices is treated as a header.
+    """
+    import pandas as pd
+
+    data = pd.read_csv(path, header=None).values
+    if len(data) and np.array_equal(data[0], np.arange(data.shape[1])):
+        data = data[1:]
+    return data.astype(np.float32)
+
+
+def label_for_csv(path):
+    parent = os.path.basename(os.path.dirname(path))
+    if parent in LABELS:
+        return parent
+    match = re.match(r"data_([a-z]+)_", os.path.basename(path))
+    return match.group(1) if match else None
+
+
+def convert_csv_trees(sources, store):
+    """Pack every landmark CSV below ``sources`` into ``store``; returns (converted, csv_bytes)."""
+    converted, csv_bytes = 0, 0
+    known = {e.get("source") for e in store.recordings()}
+    for source in sources:
+        for dirpath, _, filenames in os.walk(source):
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                # Merged files only duplicate the individual captures
+                if not filename.endswith(".csv") or filename.endswith("_merged.csv") or path in known:
+                    continue
+                label = label_for_csv(path)
+                if label is None or os.path.getsize(path) == 0:
+                    print(f"Skipping {path}")
+                    continue
+                try:
+                    data = read_landmark_csv(path)
+                    store.append(data, label, name=f"{os.path.basename(dirpath)}/{filename[:-4]}",
+                                 save=False, source=path)
+                except Exception as e:
+                    print(f"Error converting {path}: {e}")
+                    continue
+                converted += 1
+                csv_bytes += os.path.getsize(path)
+    store.save_manifest()
+    return converted, csv_bytes
+
+
+def import_videos(videos, label, store, cache, inference_width=None):
+    """Add the pose-detected frames of labelled ``videos`` to ``store``; returns the frame count.
+
+    Landmarks come from ``cache`` (a ``LandmarkCache``) when the same video
+    was processed before with the same settings, e.g. by batch_process.py.
+    """
+    from features import extract_video
+
+    known = {e.get("source") for e in store.recordings()}
+    frames = 0
+    for path in videos:
+        if path in known:
+            print(f"Skipping {path}: already in the store")
+            continue
+        landmarks, detected = cache.landmarks(path, extract_video, inference_width=inference_width)
+        if not detected.any():
+            print(f"Skipping {path}: no pose detected")
+            continue
+        store.append(landmarks[detected], label, save=False, source=path)
+        frames += int(detected.sum())
+    store.save_manifest()
+    return frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Binary landmark store (.npy shards + manifest)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="pack existing CSV captures into a store")
+    convert.add_argument("sources", nargs="*", default=["data", "increase_data"])
+    convert.add_argument("--output", default=STORE_DIR)
+    video = commands.add_parser("video", help="add labelled video files, running pose estimation on cache misses")
+    video.add_argument("videos", nargs="+")
+    video.add_argument("--label", required=True, choices=LABELS)
+    video.add_argument("--output", default=STORE_DIR)
+    video.add_argument("--inference-width", type=int, default=640)
+    info = commands.add_parser("info", help="summarise a store")
+    info.add_argument("root", nargs="?", default=STORE_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        store = LandmarkStore(args.output)
+        start = time.perf_counter()
+        converted, csv_bytes = convert_csv_trees(args.sources, store)
+        print(f"Converted {converted} CSV files in {time.perf_counter() - start:.1f}s: "
+              f"{csv_bytes / 1e6:.1f} MB of CSV -> {store.nbytes() / 1e6:.1f} MB of shards in {args.output}")
+    elif args.command == "video":
+        from landmark_cache import LandmarkCache
+
+        store = LandmarkStore(args.output)
+        cache = LandmarkCache()
+        frames = import_videos(args.videos, args.label, store, cache, args.inference_width)
+        print(f"Added {frames} frames labelled {args.label} ({cache.hits} cached, {cache.misses} extracted)")
+    else:
+        store = LandmarkStore(args.root)
+        for label in sorted({e["label"] for e in store.recordings()}):
+            entries = store.recordings(label)
+            print(f"{label}: {len(entries)} recordings, {sum(e['length'] for e in entries)} frames")
+        print(f"{len(store.manifest['shards'])} shard(s), {store.nbytes() / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,9 @@ import os
 import time
 import threading
 import winsound
+import numpy as np
+from landmark_store import LandmarkStore
+from features import extract_landmarks
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QListWidget, QMessageBox, QComboBox
 from PyQt5.QtGui import QImage, QPixmap
 from PyQt5.QtCore import QTimer
@@ -60,6 +63,9 @@ class PoseCaptureApp(QWidget):
         self.start_time = 0
         self.video_writer = None
 
+        # Captures are appended to the binary landmark store instead of one CSV each
+        self.store = LandmarkStore()
+
         self.load_file_list()
 
     def update_frame(self):
@@ -86,10 +92,8 @@ class PoseCaptureApp(QWidget):
             self.video_label.setPixmap(QPixmap.fromImage(image))
 
     def extract_landmarks(self, results):
-        landmarks = []
-        for lm in results.pose_landmarks.landmark:
-            landmarks.extend([lm.x, lm.y, lm.z, lm.visibility])
-        return landmarks
+        # Stored unscaled; any scaler is applied when the data is loaded for training
+        return extract_landmarks(results)
 
     def start_capture(self):
         threading.Thread(target=self.start_capture_sequence).start()
@@ -116,10 +120,9 @@ class PoseCaptureApp(QWidget):
 
     def save_data(self):
         tag = self.tag_selector.currentText()
-        count = sum(1 for file in os.listdir("data") if file.startswith(f"data_{tag}_"))
-        filename = f"data/data_{tag}_{count + 1}.csv"
-        df = pd.DataFrame(self.lm_list)
-        df.to_csv(filename, index=False)
+        frames = np.array(self.lm_list, dtype=np.float32).reshape(-1, self.store.num_features)
+        entry = self.store.append(frames, tag)
+        filename = entry["name"]
         if self.video_writer:
             self.video_writer.release()
             self.video_writer = None
@@ -129,6 +132,8 @@ class PoseCaptureApp(QWidget):
 
     def load_file_list(self):
         self.file_list.clear()
+        for entry in self.store.recordings():
+            self.file_list.addItem(entry["name"])
         for file in os.listdir("data"):
             if file.endswith(".csv") or file.endswith(".avi"):
                 self.file_list.addItem(file)
@@ -136,16 +141,23 @@ class PoseCaptureApp(QWidget):
     def delete_file(self):
         selected_item = self.file_list.currentItem()
         if selected_item:
-            os.remove(os.path.join("data", selected_item.text()))
+            name = selected_item.text()
+            if not self.store.remove(name):
+                os.remove(os.path.join("data", name))
             self.load_file_list()
 
     def merge_files(self):
         tag = self.tag_selector.currentText()
         merged_data = []
         for file in os.listdir("data"):
-            if file.startswith(f"data_{tag}_") and file.endswith(".csv"):
+            if file.startswith(f"data_{tag}_") and file.endswith(".csv") and not file.endswith("_merged.csv"):
                 df = pd.read_csv(os.path.join("data", file))
                 merged_data.append(df)
+        # Recordings from the binary store are read straight from the shards, under the
+        # CSV header ("0".."131", as pd.read_csv sees it) so concat lines the columns up
+        stored = self.store.load_label(tag)
+        if len(stored):
+            merged_data.append(pd.DataFrame(stored, columns=[str(i) for i in range(stored.shape[1])]))
         if merged_data:
             final_df = pd.concat(merged_data, ignore_index=True)
             final_df.to_csv(f"data/data_{tag}_merged.csv", index=False)
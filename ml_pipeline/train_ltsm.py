@@ -5,31 +5,29 @@ from keras.models import Sequential, load_model
 from keras.layers import LSTM, Dense, Dropout
 from sklearn.model_selection import train_test_split
 
+from dataset import tf_dataset
+from windowing import SlidingWindows
+
 # Đọc dữ liệu
 body_falling = pd.read_csv("./data/data_falling_merged.csv")
 body_sitting = pd.read_csv("./data/data_sitting_merged.csv")
 body_standing = pd.read_csv("./data/data_standing_merged.csv")
 
-X = []
-y = []
 no_of_timesteps = 10
 
-# Gán nhãn và tạo tập dữ liệu
+# Gán nhãn và tạo tập dữ liệu (cửa sổ trượt, không sao chép dữ liệu)
 def process_data(df, label):
-    dataset = df.iloc[:, 1:].values
-    n_sample = len(dataset)
-    for i in range(no_of_timesteps, n_sample):
-        X.append(dataset[i-no_of_timesteps:i, :])
-        y.append(label)
-
-process_data(body_falling, 0)  # Falling
-process_data(body_sitting, 1)  # Sitting
-process_data(body_standing, 2)  # Standing
-
-X, y = np.array(X), np.array(y)
+    return df.iloc[:, 1:].values, label
+
+windows = SlidingWindows([
+    process_data(body_falling, 0),  # Falling
+    process_data(body_sitting, 1),  # Sitting
+    process_data(body_standing, 2),  # Standing
+], no_of_timesteps)
+X, y = windows, windows.labels
 print(X.shape, y.shape)
 
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
+train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=0.2)
 
 # Load existing model if available, otherwise create a new one
 if os.path.exists("../model/model.h5"):
@@ -50,5 +48,6 @@ else:
     print("Created new model.")
 
 # Continue training
-model.fit(X_train, y_train, epochs=16, batch_size=32, validation_data=(X_test, y_test))
+model.fit(tf_dataset(X, y, train_idx, batch_size=32), epochs=16,
+          validation_data=tf_dataset(X, y, test_idx, batch_size=32, shuffle=False))
 model.save("model.h5")
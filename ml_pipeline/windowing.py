@@ -0,0 +1,73 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def window_view(data, length, stride=1):
+    """Zero-copy ``(windows, length, features)`` view of a ``(frames, features)`` array."""
+    data = np.asarray(data)
+    if len(data) < length:
+        return np.empty((0, length) + data.shape[1:], dtype=data.dtype)
+    # sliding_window_view puts the window axis last; move it back without copying
+    return np.moveaxis(sliding_window_view(data, length, axis=0), -1, 1)[::stride]
+
+
+def window_labels(labels, length, stride=1, assign="last"):
+    """Label per window from per-frame ``labels``: ``last``, ``center`` or ``majority`` frame."""
+    labels = np.asarray(labels)
+    if len(labels) < length:
+        return np.empty(0, dtype=np.int64)
+    if assign == "last":
+        return labels[length - 1::stride].astype(np.int64)
+    if assign == "center":
+        return labels[length // 2:len(labels) - (length - 1) + length // 2:stride].astype(np.int64)
+    if assign == "majority":
+        views = sliding_window_view(labels, length)[::stride]
+        classes = np.unique(labels)
+        counts = (views[..., None] == classes).sum(axis=1)
+        return classes[counts.argmax(axis=1)].astype(np.int64)
+    raise ValueError(f"Unknown label assignment: {assign}")
+
+
+class SlidingWindows:
+    """Training windows over several recordings, without duplicating rows.
+
+    ``sources`` is a list of ``(frames, label)`` pairs, where ``label`` is a
+    class id for the whole recording or one id per frame (reduced with
+    ``assign``). The recordings are packed once into a single float32
+    array; windows are only strided views into it, so memory stays at the
+    size of the data rather than ``length`` times it. Indexing with an
+    array of window indices copies just that batch, which makes an
+    instance usable as ``X`` in ``dataset.batches`` and ``dataset.tf_dataset``
+    together with ``labels``.
+    """
+
+    def __init__(self, sources, length, stride=1, assign="last"):
+        self.length = length
+        self.stride = stride
+        frames, starts, labels = [], [], []
+        offset = 0
+        for data, label in sources:
+            data = np.asarray(data, dtype=np.float32)
+            count = len(window_view(data, length, stride))
+            starts.append(offset + np.arange(count) * stride)
+            if np.ndim(label) == 0:
+                labels.append(np.full(count, label, dtype=np.int64))
+            else:
+                labels.append(window_labels(label, length, stride, assign))
+            frames.append(data)
+            offset += len(data)
+        self.frames = np.concatenate(frames) if frames else np.empty((0, 0), dtype=np.float32)
+        self.starts = np.concatenate(starts) if starts else np.empty(0, dtype=np.int64)
+        self.labels = np.concatenate(labels) if labels else np.empty(0, dtype=np.int64)
+        # Every window start of the packed array; starts selects those inside one recording
+        self._view = window_view(self.frames, length)
+
+    @property
+    def shape(self):
+        return (len(self.starts), self.length, self.frames.shape[1])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        return self._view[self.starts[index]]
@@ -0,0 +1,71 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from ml_pipeline.inference_backends import backend_for_path, import_runtime, load_backend
+
+# Startup phases in seconds, in the order they were recorded
+timings = {}
+
+_lock = threading.Lock()
+_models = {}
+
+
+def record_timing(name, seconds):
+    timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timed(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, time.perf_counter() - start)
+
+
+def get_model(path, backend=None, warm_up_shape=(1, 100, 132)):
+    """Return the process-wide backend for ``path``, loading it on first use.
+
+    The first call imports the runtime, loads the model and runs one dummy
+    batch so that graph tracing and allocation are paid up front rather than
+    on the first real window. Concurrent callers wait for the same load.
+    """
+    backend = backend or backend_for_path(path)
+    key = (os.path.abspath(path), backend)
+    with _lock:
+        if key not in _models:
+            with timed("runtime import"):
+                import_runtime(backend)
+            with timed("model load"):
+                model = load_backend(path, backend)
+            if warm_up_shape:
+                with timed("warm-up"):
+                    model.predict(np.zeros(warm_up_shape, dtype=np.float32))
+            _models[key] = model
+        return _models[key]
+
+
+def preload(loader=get_model, *args):
+    """Run ``loader(*args)`` (by default ``get_model(path, backend)``) on a background thread.
+
+    Callers that need the result later go through the same lock-protected
+    loader and simply wait for the load in progress.
+    """
+    thread = threading.Thread(target=loader, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def startup_report(path=None):
+    """Format the recorded startup phases; also written as JSON to ``path`` if given."""
+    if path:
+        with open(path, "w") as f:
+            json.dump(timings, f, indent=2)
+    total = sum(timings.values())
+    parts = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+    return f"Startup: {parts} (total {total:.2f}s)"
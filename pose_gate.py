@@ -0,0 +1,60 @@
+import cv2
+
+MOTION_SIZE = (64, 48)
+
+
+class PoseGate:
+    """Pre-stage in front of ``pose.process``.
+
+    Frames are downscaled to ``inference_width`` (landmarks are normalised,
+    so they still line up with the full-size frame) and pose estimation is
+    skipped, reusing the last results, while the mean absolute difference of
+    a tiny grayscale thumbnail against the last processed frame stays below
+    ``motion_threshold`` (0..1). ``max_skip`` forces a fresh estimate every so
+    often so a slow drift is never missed. A threshold of 0 disables gating.
+    Frames are BGR unless ``rgb`` is set (e.g. from ``FFmpegCapture``), in
+    which case they go to mediapipe without a color conversion.
+    """
+
+    def __init__(self, pose, inference_width=None, motion_threshold=0.0, max_skip=30, rgb=False):
+        self.pose = pose
+        self.rgb = rgb
+        self.inference_width = inference_width
+        self.motion_threshold = motion_threshold
+        self.max_skip = max_skip
+        self.processed = 0
+        self.skipped = 0
+        self.motion = 0.0
+        self._reference = None
+        self._results = None
+        self._skipped_in_row = 0
+
+    def resize(self, frame):
+        h, w = frame.shape[:2]
+        if not self.inference_width or w <= self.inference_width:
+            return frame
+        height = max(1, round(h * self.inference_width / w))
+        return cv2.resize(frame, (self.inference_width, height), interpolation=cv2.INTER_AREA)
+
+    def process(self, frame):
+        """Return mediapipe results for a frame, possibly reused from an earlier frame."""
+        small = self.resize(frame)
+        if self.motion_threshold > 0:
+            thumb = cv2.cvtColor(cv2.resize(small, MOTION_SIZE, interpolation=cv2.INTER_AREA),
+                                 cv2.COLOR_RGB2GRAY if self.rgb else cv2.COLOR_BGR2GRAY)
+            if self._reference is not None:
+                self.motion = float(cv2.absdiff(thumb, self._reference).mean()) / 255.0
+            if (self._results is not None and self.motion < self.motion_threshold
+                    and self._skipped_in_row < self.max_skip):
+                self._skipped_in_row += 1
+                self.skipped += 1
+                return self._results
+            self._reference = thumb
+        self._skipped_in_row = 0
+        self.processed += 1
+        self._results = self.pose.process(small if self.rgb else cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+        return self._results
+
+    def skip_ratio(self):
+        total = self.processed + self.skipped
+        return self.skipped / total if total else 0.0
@@ -0,0 +1,122 @@
+import mediapipe as mp
+from landmark_window import LandmarkWindow
+from pose_gate import PoseGate
+from inference_server import decode_prediction
+from ml_pipeline.features import FeatureExtractor
+
+mp_pose = mp.solutions.pose
+mp_drawing = mp.solutions.drawing_utils
+
+
+class PosePipeline:
+    """Per-stream state for the pose -> landmark window -> LSTM path.
+
+    Every stream owns one of these so that its mediapipe graph and its
+    landmark window are never shared with another camera. Once the window is
+    full the classifier runs every ``stride`` frames instead of on every frame.
+    When a ``BatchInferenceServer`` is given, windows are classified through it
+    together with the other streams instead of calling ``model`` directly.
+    With a ``StreamingClassifier`` the LSTM state is advanced one frame at a
+    time and ``classify`` just reads the latest output.
+
+    ``model`` is an inference backend from ``ml_pipeline.inference_backends``.
+    ``inference_width`` and ``motion_threshold`` configure the ``PoseGate``
+    in front of mediapipe; set ``rgb`` when frames come from ``FFmpegCapture``.
+    Landmarks go through ``ml_pipeline.features``, the same extraction (and
+    optional ``scaler``) used for training data. With a ``prefilter`` (an
+    ``ml_pipeline.fall_gate.FallGate``) a due window is only classified when
+    the gate finds a fall plausible. Once the gate closes, the window is
+    classified one more time after ``no_of_timesteps`` frames, when it holds
+    only frames recorded since the motion stopped, so a label set during
+    motion (e.g. Falling) is replaced by one for the still posture instead
+    of standing forever.
+    """
+
+    def __init__(self, model, no_of_timesteps=100, num_features=132, stride=1,
+                 server=None, stream_id=None, streaming=None,
+                 inference_width=None, motion_threshold=0.0, rgb=False, scaler=None,
+                 prefilter=None):
+        self.model = model
+        self.server = server
+        self.stream_id = stream_id
+        self.streaming = streaming
+        self._streaming_output = None
+        self.no_of_timesteps = no_of_timesteps
+        self.num_features = num_features
+        self.stride = max(1, stride)
+        self.pose = mp_pose.Pose()
+        self.gate = PoseGate(self.pose, inference_width, motion_threshold, rgb=rgb)
+        self.window = LandmarkWindow(no_of_timesteps, num_features)
+        self.features = FeatureExtractor(scaler)
+        self.prefilter = prefilter
+        # Primed so the first full window is classified straight away
+        self._frames_since_predict = self.stride - 1
+        self._gate_open = False
+        self._settle = 1  # frames until the closed gate's final classification (0 = none pending)
+
+    def observe(self, frame):
+        """Run pose estimation on a frame and update the landmark window.
+
+        Returns ``(results, due)`` where ``due`` tells whether the classifier
+        should run on this frame.
+        """
+        results = self.gate.process(frame)
+        return results, self.update(results)
+
+    def update(self, results):
+        """Append the landmarks from pose ``results`` to the window.
+
+        Returns whether the classifier should run on this frame.
+        """
+        landmarks = self.features(results)
+        if landmarks is None:
+            return False
+
+        self.window.append(landmarks)
+        if self.streaming is not None:
+            window = self.window.view()[0]
+            self._streaming_output = self.streaming.update(window[-1], window)
+
+        if not self.window.is_full():
+            return False
+        self._frames_since_predict += 1
+        settled = False
+        if self._settle:
+            self._settle -= 1
+            settled = self._settle == 0
+        if self._frames_since_predict < self.stride and not settled:
+            return False
+        self._frames_since_predict = 0
+        if self.prefilter is None or self.streaming is not None or settled:
+            return True
+        if self.prefilter(self.window.view()[0]):
+            self._gate_open = True
+            self._settle = 0
+            return True
+        if self._gate_open:
+            self._gate_open = False
+            self._settle = self.no_of_timesteps
+        return False
+
+    def classify(self):
+        """Classify the current window and return ``(label, confidence)``."""
+        if self.streaming is not None:
+            prediction = self._streaming_output
+        elif self.server is not None:
+            prediction = self.server.submit(self.stream_id, self.window.view()).result()
+        else:
+            prediction = self.model.predict(self.window.view())[0]
+        return decode_prediction(prediction)
+
+    def process(self, frame):
+        """Run pose estimation on a frame.
+
+        Returns ``(results, prediction)`` where ``prediction`` is
+        ``(label, confidence)`` on frames where the classifier ran, otherwise
+        ``None``.
+        """
+        results, due = self.observe(frame)
+        return results, self.classify() if due else None
+
+    def close(self):
+        self.pose.close()
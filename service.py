@@ -0,0 +1,203 @@
+import sys
+import json
+import time
+import asyncio
+import sqlite3
+import argparse
+
+from aiohttp import web, WSMsgType
+
+from event_store import EventStore
+from stream_engine import DB_PATH, MODEL_PATH, StreamEngine
+
+
+def _number(value, cast, name):
+    """``cast(value)``, or a 400 naming the offending parameter."""
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise web.HTTPBadRequest(text=f"{name} must be a number")
+
+
+class DetectionService:
+    """Headless daemon: runs the stream engine and serves its labels over HTTP/WebSocket.
+
+    Endpoints:
+        GET    /health          engine and worker status
+        GET    /streams         current label per stream
+        POST   /streams         add a stream, body ``{"url": ...}``
+        DELETE /streams/{id}    remove a stream
+        GET    /events          stored label changes, newest first;
+                                ``?label=Falling&hours=24&stream_id=1&limit=100``
+        GET    /ws              snapshot, then every label change as it happens
+
+    Nothing in this path imports PyQt5.
+    """
+
+    def __init__(self, engine, sync_interval=10):
+        self.engine = engine
+        self.sync_interval = sync_interval
+        self.sockets = set()
+        self.started = time.time()
+        self._tasks = []
+
+    def stream_state(self, stream_id, url=None):
+        label, confidence, timestamp = self.engine.labels.get(stream_id, (None, None, None))
+        return {
+            "stream_id": stream_id,
+            "url": url or self.engine.urls.get(stream_id),
+            "label": label,
+            "confidence": confidence,
+            "timestamp": timestamp,
+        }
+
+    def snapshot(self):
+        # engine.sync() adds and removes streams from an executor thread; iterate over a copy
+        return [self.stream_state(stream_id, url) for stream_id, url in sorted(list(self.engine.urls.items()))]
+
+    async def broadcast(self, message):
+        for ws in list(self.sockets):
+            try:
+                await ws.send_json(message)
+            except ConnectionError:
+                self.sockets.discard(ws)
+
+    async def pump_results(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            previous = {stream_id: state[0] for stream_id, state in list(self.engine.labels.items())}
+            updates = await loop.run_in_executor(None, self.engine.poll, 0.5)
+            for stream_id, label, confidence, timestamp in updates:
+                if previous.get(stream_id) == label:
+                    continue
+                previous[stream_id] = label
+                await self.broadcast({"type": "label", "stream_id": stream_id, "label": label,
+                                      "confidence": confidence, "timestamp": timestamp})
+
+    async def sync_streams(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            await loop.run_in_executor(None, self.engine.sync)
+
+    async def on_startup(self, app):
+        await asyncio.get_running_loop().run_in_executor(None, self.engine.start)
+        self._tasks = [asyncio.create_task(self.pump_results()), asyncio.create_task(self.sync_streams())]
+
+    async def on_cleanup(self, app):
+        for task in self._tasks:
+            task.cancel()
+        for ws in list(self.sockets):
+            await ws.close()
+        await asyncio.get_running_loop().run_in_executor(None, self.engine.stop)
+
+    async def health(self, request):
+        workers = [process.is_alive() for process, _ in self.engine.workers]
+        return web.json_response({
+            # all([]) is True: streams configured but no worker running is not healthy
+            "status": "ok" if all(workers) and (workers or not self.engine.urls) else "degraded",
+            "uptime": time.time() - self.started,
+            "streams": len(self.engine.urls),
+            "workers": len(workers),
+            "workers_alive": sum(workers),
+            "clients": len(self.sockets),
+        })
+
+    async def list_streams(self, request):
+        return web.json_response(self.snapshot())
+
+    async def add_stream(self, request):
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            raise web.HTTPBadRequest(text="body must be JSON")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text='body must be a JSON object like {"url": ...}')
+        url = str(body.get("url", "")).strip()
+        if not url:
+            raise web.HTTPBadRequest(text="url is required")
+        conn = sqlite3.connect(self.engine.db_path)
+        try:
+            with conn:
+                conn.execute("INSERT INTO streams (url) VALUES (?)", (url,))
+        except sqlite3.IntegrityError:
+            raise web.HTTPConflict(text="Stream URL already exists")
+        finally:
+            conn.close()
+        await asyncio.get_running_loop().run_in_executor(None, self.engine.sync)
+        return web.json_response(self.snapshot(), status=201)
+
+    async def delete_stream(self, request):
+        stream_id = _number(request.match_info["stream_id"], int, "stream_id")
+        conn = sqlite3.connect(self.engine.db_path)
+        try:
+            with conn:
+                deleted = conn.execute("DELETE FROM streams WHERE id = ?", (stream_id,)).rowcount
+        finally:
+            conn.close()
+        if not deleted:
+            raise web.HTTPNotFound()
+        await asyncio.get_running_loop().run_in_executor(None, self.engine.sync)
+        return web.json_response(self.snapshot())
+
+    async def list_events(self, request):
+        store = self.engine.event_store
+        if store is None:
+            raise web.HTTPNotFound(text="Event store is disabled")
+        query = request.query
+        hours = _number(query["hours"], float, "hours") if "hours" in query else None
+        stream_id = _number(query["stream_id"], int, "stream_id") if "stream_id" in query else None
+        limit = _number(query.get("limit", 100), int, "limit")
+        events = await asyncio.get_running_loop().run_in_executor(
+            None, store.query, query.get("label"), hours, stream_id, limit)
+        return web.json_response(events)
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        self.sockets.add(ws)
+        try:
+            await ws.send_json({"type": "snapshot", "streams": self.snapshot()})
+            async for msg in ws:
+                if msg.type == WSMsgType.ERROR:
+                    break
+        finally:
+            self.sockets.discard(ws)
+        return ws
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_get("/health", self.health)
+        app.router.add_get("/streams", self.list_streams)
+        app.router.add_post("/streams", self.add_stream)
+        app.router.add_delete("/streams/{stream_id}", self.delete_stream)
+        app.router.add_get("/events", self.list_events)
+        app.router.add_get("/ws", self.websocket)
+        app.on_startup.append(self.on_startup)
+        app.on_cleanup.append(self.on_cleanup)
+        return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless pose detection service with an HTTP/WebSocket API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--backend", choices=["keras", "tflite", "onnx"], default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch", action="store_true",
+                        help="run one LSTM in the service process and micro-batch windows from all streams")
+    parser.add_argument("--stride", type=int, default=1)
+    parser.add_argument("--sync-interval", type=float, default=10,
+                        help="seconds between re-reading the streams table")
+    args = parser.parse_args(argv)
+
+    engine = StreamEngine(args.db, args.workers, args.batch, event_store=EventStore(args.db),
+                          model_path=args.model, backend=args.backend, stride=args.stride)
+    service = DetectionService(engine, args.sync_interval)
+    web.run_app(service.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
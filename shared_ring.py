@@ -0,0 +1,83 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+_SEQ_ALIGN = 64
+
+
+class SharedRing:
+    """Ring of fixed-shape array slots in one ``multiprocessing.shared_memory`` segment.
+
+    The segment starts with one int64 sequence number per slot, followed by
+    the slot arrays. A writer fills slot ``seq % slots`` in place and then
+    publishes ``seq``; it sends only ``(slot, seq)`` to the reader, which
+    gets a zero-copy view with ``read`` and checks ``valid`` after using it
+    to detect that the writer lapped the ring in the meantime. The writer
+    never blocks: like ``FrameGrabber``, newest data wins.
+
+    The creating process owns the segment and must ``unlink`` it; other
+    processes ``attach`` with ``spec()`` and only ``close``.
+    """
+
+    def __init__(self, slots, shape, dtype=np.float32, name=None, create=True):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        seq_bytes = -(-slots * 8 // _SEQ_ALIGN) * _SEQ_ALIGN
+        slot_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.shm = shared_memory.SharedMemory(name=name, create=create,
+                                              size=seq_bytes + slots * slot_bytes if create else 0)
+        self._seq = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf)
+        self._data = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self.shm.buf, offset=seq_bytes)
+        if create:
+            self._seq[:] = -1
+        self._next = 0
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(spec["slots"], spec["shape"], spec["dtype"], name=spec["name"], create=False)
+
+    def spec(self):
+        """Picklable description for ``attach`` in another process."""
+        return {"name": self.shm.name, "slots": self.slots, "shape": self.shape, "dtype": self.dtype.str}
+
+    def begin(self):
+        """Reserve the next slot; returns ``(slot, seq, view)`` to fill before ``commit``."""
+        seq = self._next
+        slot = seq % self.slots
+        self._seq[slot] = -1  # readers reject the slot while it is being rewritten
+        self._next += 1
+        return slot, seq, self._data[slot]
+
+    def commit(self, slot, seq):
+        self._seq[slot] = seq
+
+    def write(self, array):
+        """Copy ``array`` into the next slot and return its ``(slot, seq)``."""
+        slot, seq, view = self.begin()
+        view[...] = array
+        self.commit(slot, seq)
+        return slot, seq
+
+    def read(self, slot, seq):
+        """Zero-copy view of ``slot`` if it still holds ``seq``, else None."""
+        if self._seq[slot] != seq:
+            return None
+        return self._data[slot]
+
+    def valid(self, slot, seq):
+        return self._seq[slot] == seq
+
+    def close(self):
+        self._seq = self._data = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A caller still holds a view; the mapping goes away with it
+            pass
+
+    def unlink(self):
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
@@ -1,8 +1,9 @@
 import subprocess
 import time
-import cv2
 import os
 
+from stream_supervisor import probe
+
 FFMPEG_PATH = r"D:/ffmpeg/bin/ffmpeg.exe"
 
 def start_stream(video_path, stream_id, localhost_url):
@@ -21,12 +22,10 @@ def start_stream(video_path, stream_id, localhost_url):
     except Exception as e:
         print(f"Lỗi khác: {e}")
 
-def check_stream(rtsp_url):
-    cap = cv2.VideoCapture(rtsp_url)
-    time.sleep(2)  # Allow some time for the stream to initialize
-    if cap.isOpened():
+def check_stream(rtsp_url, timeout=10):
+    # Retries with backoff until a frame is actually decoded or the timeout expires
+    if probe(rtsp_url, timeout):
         print(f"Stream {rtsp_url} is running.")
-        cap.release()
     else:
         print(f"Failed to connect to stream {rtsp_url}.")
 
@@ -0,0 +1,416 @@
+import os
+import sys
+import time
+import queue
+import sqlite3
+import argparse
+import functools
+import threading
+import multiprocessing
+
+import numpy as np
+
+from event_store import EventStore
+from inference_server import BatchInferenceServer, decode_prediction
+from shared_ring import SharedRing
+
+MODEL_PATH = "./ml_pipeline/model.h5"
+DB_PATH = "streams.db"
+WINDOW_SHAPE = (100, 132)  # PosePipeline's default landmark window
+WINDOW_SLOTS = 4  # shared-memory window slots per stream in batch mode
+
+# Per-stream settings shipped to every worker process
+DEFAULT_SETTINGS = {
+    "model_path": MODEL_PATH,
+    "backend": None,  # keras / tflite / onnx, guessed from the model extension when None
+    "stride": 1,
+    "streaming": False,
+    "inference_width": 640,  # downscale wider frames before pose estimation (None = full size)
+    "motion_threshold": 0.0,  # skip pose estimation below this motion score (0 = off)
+    "capture": "opencv",  # opencv (cv2.VideoCapture) or ffmpeg (scaled RGB frames from an ffmpeg pipe)
+    "capture_fps": None,  # with ffmpeg capture, have ffmpeg drop frames down to this rate
+    "scaler": None,  # feature scaler (.pkl/.npz) applied to landmarks; must match what the model was trained on
+    "prefilter": False,  # only run the LSTM on windows where ml_pipeline.fall_gate finds a fall plausible
+    "clip_dir": "clips",  # MP4 clips around Falling detections (None = off); not recorded in batch mode
+    "clip_pre_seconds": 10.0,
+    "clip_post_seconds": 5.0,
+}
+
+
+def load_streams(db_path=DB_PATH):
+    """Return ``[(id, url), ...]`` from the ``streams`` table."""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS streams (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT UNIQUE
+            )
+        """)
+        return conn.execute("SELECT id, url FROM streams ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def run_stream(stream_id, url, model, network, settings, results, stop_event, windows=None, ring_spec=None,
+               clips=None):
+    """Capture loop for a single stream inside a worker process.
+
+    With a ``windows`` queue the worker only does pose estimation and ships
+    each due window to the parent's batched LSTM instead of classifying it:
+    the window is written into the stream's ``SharedRing`` (``ring_spec``)
+    and only ``(stream_id, slot, seq, timestamp)`` goes through the queue.
+    With a streaming ``network`` the stream keeps its own LSTM hidden state.
+    With a ``clips`` writer (only without ``windows``, where labels are
+    produced next to the frames) the stream keeps a ``ClipBuffer`` and a
+    Falling result carries the path of its clip as a fifth element.
+    """
+    from pose_pipeline import PosePipeline
+    from stream_supervisor import BACKOFF, StreamSupervisor, open_capture
+    from streaming_lstm import StreamingClassifier
+    from ml_pipeline.features import load_scaler
+    from ml_pipeline.fall_gate import FallGate
+
+    rgb = settings["capture"] == "ffmpeg"
+    if rgb:
+        from ffmpeg_capture import FFmpegCapture
+
+        # ffmpeg decodes straight to inference resolution in RGB
+        def opener(url):
+            return FFmpegCapture(url, width=settings["inference_width"], fps=settings["capture_fps"])
+    else:
+        opener = open_capture
+    streaming = StreamingClassifier(network) if network is not None else None
+    scaler = load_scaler(settings["scaler"])
+    pipeline = PosePipeline(model, stride=settings["stride"], streaming=streaming,
+                            inference_width=settings["inference_width"],
+                            motion_threshold=settings["motion_threshold"], rgb=rgb, scaler=scaler,
+                            prefilter=FallGate(scaler=scaler) if settings["prefilter"] else None)
+
+    def on_state(state):
+        # Every failed, ended or stalled capture shows up as an "error" label until frames flow again
+        if state == BACKOFF:
+            results.put((stream_id, "error", 0.0, time.time()))
+
+    clip_buffer = None
+    if clips is not None:
+        from clip_recorder import ClipBuffer
+
+        clip_buffer = ClipBuffer(clips, f"stream_{stream_id}", settings["clip_pre_seconds"],
+                                 settings["clip_post_seconds"], rgb=rgb)
+    last_label = None
+    ring = SharedRing.attach(ring_spec) if windows is not None else None
+    # The capture is reopened with backoff on failure; the pipeline and its window are kept
+    supervisor = StreamSupervisor(url, opener, on_state=on_state).start()
+    try:
+        while not stop_event.is_set():
+            ret, frame = supervisor.read(timeout=1.0)
+            if not ret:
+                continue
+            if clip_buffer is not None:
+                clip_buffer.add(frame)
+            _, due = pipeline.observe(frame)
+            if not due:
+                continue
+            if ring is not None:
+                slot, seq = ring.write(pipeline.window.view()[0])
+                windows.put((stream_id, slot, seq, time.time()))
+            else:
+                label, confidence = pipeline.classify()
+                clip_path = None
+                if clip_buffer is not None and label == "Falling" and last_label != "Falling":
+                    clip_path = clip_buffer.trigger()
+                last_label = label
+                results.put((stream_id, label, confidence, time.time(), clip_path))
+    finally:
+        supervisor.stop()
+        pipeline.close()
+        if clip_buffer is not None:
+            clip_buffer.flush()
+        if ring is not None:
+            ring.close()
+
+
+def run_worker(settings, commands, results, windows=None):
+    """Worker process entry point.
+
+    A worker loads its own copy of the model (unless inference is batched in
+    the parent) and runs each stream it is told to start on its own thread.
+    ``commands`` carries ``("start", stream_id, url, ring_spec)``, ``("stop", stream_id)``
+    and ``("shutdown",)``. With the default pool size every stream gets a
+    dedicated process.
+    """
+    import model_cache
+
+    model = None
+    network = None
+    if windows is None:
+        model = model_cache.get_model(settings["model_path"], settings["backend"])
+        if settings["streaming"]:
+            from streaming_lstm import StreamingLSTM
+            network = StreamingLSTM.from_keras(model.model)
+    clips = None
+    if windows is None and settings["clip_dir"]:
+        from clip_recorder import ClipWriter
+
+        clips = ClipWriter(settings["clip_dir"])
+    streams = {}
+    while True:
+        command = commands.get()
+        if command[0] == "start":
+            _, stream_id, url, ring_spec = command
+            stop_event = threading.Event()
+            thread = threading.Thread(target=run_stream,
+                                      args=(stream_id, url, model, network, settings, results, stop_event,
+                                            windows, ring_spec, clips),
+                                      daemon=True)
+            thread.start()
+            streams[stream_id] = (thread, stop_event)
+        elif command[0] == "stop":
+            thread, stop_event = streams.pop(command[1], (None, None))
+            if stop_event is not None:
+                stop_event.set()
+        elif command[0] == "shutdown":
+            break
+    for thread, stop_event in streams.values():
+        stop_event.set()
+    for thread, stop_event in streams.values():
+        thread.join(timeout=5)
+    if clips is not None:
+        clips.close()
+
+
+class StreamEngine:
+    """Headless engine running every stream from streams.db in worker processes.
+
+    ``sync`` starts streams that were added to the ``streams`` table and stops
+    the ones that were deleted; new streams go to the least loaded of at most
+    ``max_workers`` worker processes. With ``batch_inference`` the workers
+    only run pose estimation; the parent owns the single LSTM and classifies
+    windows from all streams together through a ``BatchInferenceServer``.
+    Remaining keyword arguments override ``DEFAULT_SETTINGS`` and are passed
+    to every worker.
+    """
+
+    def __init__(self, db_path=DB_PATH, max_workers=None, batch_inference=False,
+                 max_batch_size=32, max_wait_ms=5, event_store=None, **settings):
+        unknown = set(settings) - set(DEFAULT_SETTINGS)
+        if unknown:
+            raise TypeError(f"Unknown engine settings: {', '.join(sorted(unknown))}")
+        self.settings = dict(DEFAULT_SETTINGS, **settings)
+        if batch_inference and self.settings["streaming"]:
+            raise ValueError("streaming inference runs inside the workers and cannot be batched")
+        if self.settings["streaming"] and self.settings["backend"] not in (None, "keras"):
+            raise ValueError("streaming inference needs the Keras weights (backend='keras')")
+        self.db_path = db_path
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_inference = batch_inference
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.event_store = event_store
+        self.ctx = multiprocessing.get_context("spawn")
+        self.results = self.ctx.Queue()
+        self.windows = self.ctx.Queue() if batch_inference else None
+        self.rings = {}  # stream_id -> SharedRing of landmark windows (batch mode)
+        self._rings_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.server = None
+        self.workers = []  # [(process, command queue), ...]
+        self.assignments = {}  # stream_id -> index into self.workers
+        self.urls = {}
+        self.labels = {}
+
+    def start(self):
+        if self.batch_inference:
+            self._start_server()
+        self.sync()
+
+    def sync(self):
+        """Bring the running streams in line with the ``streams`` table."""
+        streams = dict(load_streams(self.db_path))
+        for stream_id in list(self.assignments):
+            if streams.get(stream_id) != self.urls.get(stream_id):
+                self._stop_stream(stream_id)
+        for stream_id, url in streams.items():
+            if stream_id not in self.assignments:
+                self._start_stream(stream_id, url)
+        return streams
+
+    def _start_stream(self, stream_id, url):
+        if len(self.workers) < self.max_workers:
+            commands = self.ctx.Queue()
+            process = self.ctx.Process(target=run_worker,
+                                       args=(self.settings, commands, self.results, self.windows),
+                                       daemon=True)
+            process.start()
+            self.workers.append((process, commands))
+        load = [0] * len(self.workers)
+        for index in self.assignments.values():
+            load[index] += 1
+        index = load.index(min(load))
+        ring_spec = None
+        if self.batch_inference:
+            ring = SharedRing(WINDOW_SLOTS, WINDOW_SHAPE)
+            with self._rings_lock:
+                self.rings[stream_id] = ring
+            ring_spec = ring.spec()
+        self.workers[index][1].put(("start", stream_id, url, ring_spec))
+        self.assignments[stream_id] = index
+        self.urls[stream_id] = url
+        print(f"Started stream {stream_id} ({url}) on worker {index}")
+
+    def _stop_stream(self, stream_id):
+        index = self.assignments.pop(stream_id)
+        self.workers[index][1].put(("stop", stream_id))
+        self.urls.pop(stream_id, None)
+        self.labels.pop(stream_id, None)
+        self._release_ring(stream_id)
+        print(f"Stopped stream {stream_id}")
+
+    def _release_ring(self, stream_id):
+        # Unlinking frees the segment once the worker has closed its mapping too;
+        # windows still queued for this stream are dropped by _dispatch_windows
+        with self._rings_lock:
+            ring = self.rings.pop(stream_id, None)
+            if ring is not None:
+                ring.close()
+                ring.unlink()
+
+    def _start_server(self):
+        import model_cache
+
+        model = model_cache.get_model(self.settings["model_path"], self.settings["backend"])
+        self.server = BatchInferenceServer(model.predict, self.max_batch_size, self.max_wait_ms).start()
+        threading.Thread(target=self._dispatch_windows, daemon=True).start()
+
+    def _dispatch_windows(self):
+        while not self.stop_event.is_set():
+            try:
+                stream_id, slot, seq, timestamp = self.windows.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            with self._rings_lock:
+                ring = self.rings.get(stream_id)
+                view = ring.read(slot, seq) if ring is not None else None
+                if view is None:
+                    # Stream removed, or the worker already overwrote the slot with a newer window
+                    continue
+                window = np.array(view)
+                del view
+                # Checked after the copy: a writer that lapped the ring mid-copy left a torn window
+                if not ring.valid(slot, seq):
+                    continue
+            future = self.server.submit(stream_id, window)
+            future.add_done_callback(functools.partial(self._on_prediction, stream_id, timestamp))
+
+    def _on_prediction(self, stream_id, timestamp, future):
+        if future.exception() is not None:
+            self.results.put((stream_id, "error", 0.0, timestamp))
+            return
+        label, confidence = decode_prediction(future.result())
+        self.results.put((stream_id, label, confidence, timestamp))
+
+    def poll(self, timeout=0.1):
+        """Drain pending results into ``self.labels`` and return them."""
+        updates = []
+        try:
+            item = self.results.get(timeout=timeout)
+            while True:
+                stream_id, label, confidence, timestamp, *clip = item
+                self.labels[stream_id] = (label, confidence, timestamp)
+                # "error" is connection state, not a detection: storing it would reset the
+                # store's per-stream dedupe and log an ongoing Falling again after a reconnect
+                if self.event_store is not None and label != "error":
+                    self.event_store.record(stream_id, label, confidence, timestamp,
+                                            clip_path=clip[0] if clip else None)
+                updates.append((stream_id, label, confidence, timestamp))
+                item = self.results.get_nowait()
+        except queue.Empty:
+            pass
+        return updates
+
+    def is_running(self):
+        return any(process.is_alive() for process, _ in self.workers)
+
+    def stop(self, timeout=5):
+        self.stop_event.set()
+        for _, commands in self.workers:
+            commands.put(("shutdown",))
+        for process, _ in self.workers:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        for stream_id in list(self.rings):
+            self._release_ring(stream_id)
+        self.workers = []
+        self.assignments = {}
+        self.urls = {}
+        if self.event_store is not None:
+            self.event_store.close()
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
+
+    def run_forever(self, sync_interval=10):
+        self.start()
+        last_sync = time.monotonic()
+        try:
+            while True:
+                for stream_id, label, confidence, timestamp in self.poll(timeout=1.0):
+                    stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+                    print(f"[{stamp}] stream {stream_id}: {label} ({confidence:.2f})")
+                if time.monotonic() - last_sync >= sync_interval:
+                    self.sync()
+                    last_sync = time.monotonic()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run pose detection on every stream in streams.db")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--model", default=MODEL_PATH, help=".h5/.keras, .tflite or .onnx model")
+    parser.add_argument("--backend", choices=["keras", "tflite", "onnx"], default=None,
+                        help="inference runtime (default: guessed from the model extension)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker process pool size (default: one per CPU)")
+    parser.add_argument("--stride", type=int, default=1,
+                        help="classify every k-th frame once the landmark window is full")
+    parser.add_argument("--batch", action="store_true",
+                        help="run one LSTM in the parent and micro-batch windows from all streams")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    parser.add_argument("--streaming", action="store_true",
+                        help="step a stateful copy of the LSTM once per frame instead of re-running the window")
+    parser.add_argument("--inference-width", type=int, default=640,
+                        help="downscale frames wider than this before pose estimation")
+    parser.add_argument("--motion-threshold", type=float, default=0.0,
+                        help="reuse the last landmarks while the frame-difference score stays below this (0..1)")
+    parser.add_argument("--capture", choices=["opencv", "ffmpeg"], default="opencv",
+                        help="ffmpeg decodes through a subprocess, scaled to --inference-width and converted to RGB")
+    parser.add_argument("--capture-fps", type=float, default=None,
+                        help="with --capture ffmpeg, drop frames in ffmpeg down to this rate")
+    parser.add_argument("--scaler", default=None,
+                        help="apply this feature scaler (.pkl/.npz) to landmarks, for models trained on scaled features")
+    parser.add_argument("--clip-dir", default="clips",
+                        help="write MP4 clips around Falling detections here (not in --batch mode)")
+    parser.add_argument("--no-clips", action="store_true")
+    parser.add_argument("--prefilter", action="store_true",
+                        help="skip the LSTM on windows without fall-like torso motion or posture")
+    args = parser.parse_args(argv)
+    if args.batch and args.streaming:
+        parser.error("--batch and --streaming cannot be combined")
+    engine = StreamEngine(args.db, args.workers, args.batch, args.max_batch_size, args.max_wait_ms,
+                          event_store=EventStore(args.db),
+                          model_path=args.model, backend=args.backend, stride=args.stride,
+                          streaming=args.streaming, inference_width=args.inference_width,
+                          motion_threshold=args.motion_threshold, capture=args.capture,
+                          capture_fps=args.capture_fps, scaler=args.scaler, prefilter=args.prefilter,
+                          clip_dir=None if args.no_clips else args.clip_dir)
+    engine.run_forever()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+import time
+import random
+import threading
+
+from frame_grabber import FrameGrabber
+
+CONNECTING = "connecting"
+LIVE = "live"
+STALLED = "stalled"
+BACKOFF = "backoff"
+STOPPED = "stopped"
+
+
+def open_capture(url):
+    import cv2
+
+    return cv2.VideoCapture(url)
+
+
+class StreamSupervisor:
+    """Keeps one camera connected: reconnects with jittered exponential backoff.
+
+    A supervisor thread opens the capture, hands it to a ``FrameGrabber``
+    and watches the time of the last decoded frame. A capture that fails to
+    open, ends, or delivers nothing for ``stall_timeout`` seconds
+    (``connect_timeout`` before the first frame) is dropped and reopened
+    after ``base_delay * 2**failures`` seconds (capped at ``max_delay``,
+    shortened by up to ``jitter`` at random so many cameras do not
+    reconnect in lockstep). ``failures`` resets once frames flow again.
+    A dropped capture with an ``interrupt`` method (``FFmpegCapture``) is
+    interrupted, so a read hung on a dead source doesn't leak the decoder
+    process and the grabber thread.
+
+    Consumers only call ``read``; it keeps returning frames across
+    reconnects, so per-stream state such as the landmark window survives an
+    outage. ``state`` is one of connecting, live, stalled, backoff or
+    stopped, and ``on_state(state)`` is called on every change from the
+    supervisor thread.
+    """
+
+    def __init__(self, url, opener=open_capture, stall_timeout=5.0, connect_timeout=10.0,
+                 base_delay=0.5, max_delay=30.0, jitter=0.5, watchdog_interval=0.5, on_state=None):
+        self.url = url
+        self.opener = opener
+        self.stall_timeout = stall_timeout
+        self.connect_timeout = connect_timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.watchdog_interval = watchdog_interval
+        self.on_state = on_state
+        self.state = STOPPED
+        self.failures = 0
+        self.reconnects = 0
+        self.timestamp = None
+        self._cond = threading.Condition()
+        self._grabber = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._frames = 0
+        self._dropped = 0
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _set_state(self, state):
+        if state == self.state:
+            return
+        self.state = state
+        if self.on_state is not None:
+            self.on_state(state)
+
+    def _run(self):
+        connects = 0
+        while not self._stop.is_set():
+            self._set_state(CONNECTING)
+            cap = self.opener(self.url)
+            if self._stop.is_set() or not cap.isOpened():
+                cap.release()
+                if not self._stop.is_set():
+                    self._backoff()
+                continue
+            if connects:
+                self.reconnects += 1
+            connects += 1
+            grabber = FrameGrabber(cap).start()
+            with self._cond:
+                self._grabber = grabber
+                self._cond.notify_all()
+            self._watch(grabber)
+            # Don't wait for a read stuck inside FFmpeg; the grabber releases the capture itself
+            # once the read returns, which interrupt() forces for captures that support it
+            self._interrupt(grabber)
+            grabber.stop(timeout=0)
+            with self._cond:
+                self._grabber = None
+                self._frames += grabber.frames
+                self._dropped += grabber.dropped
+                self._cond.notify_all()
+            if not self._stop.is_set():
+                self._backoff()
+        self._set_state(STOPPED)
+
+    def _watch(self, grabber):
+        connected = time.monotonic()
+        while not self._stop.wait(self.watchdog_interval):
+            last = grabber.last_frame_time
+            if last is not None and self.state != LIVE:
+                self._set_state(LIVE)
+                self.failures = 0
+            if not grabber.running:
+                return
+            if last is None:
+                stalled = time.monotonic() - connected > self.connect_timeout
+            else:
+                stalled = time.monotonic() - last > self.stall_timeout
+            if stalled:
+                self._set_state(STALLED)
+                return
+
+    @staticmethod
+    def _interrupt(grabber):
+        interrupt = getattr(grabber.cap, "interrupt", None)
+        if interrupt is not None:
+            interrupt()
+
+    def _backoff(self):
+        self._set_state(BACKOFF)
+        delay = min(self.max_delay, self.base_delay * 2 ** self.failures)
+        delay *= 1 - self.jitter * random.random()
+        self.failures += 1
+        self._stop.wait(delay)
+
+    def read(self, timeout=None):
+        """Return ``(True, frame)`` with the newest frame, or ``(False, None)``.
+
+        ``False`` only means no frame arrived within ``timeout`` (or the
+        supervisor was stopped); keep calling ``read`` while ``is_running``.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        ended = None
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            with self._cond:
+                # After a capture ends, wait for the supervisor to replace it instead of spinning
+                ready = self._cond.wait_for(
+                    lambda: self._grabber not in (None, ended) or self._stop.is_set(), remaining)
+                grabber = self._grabber
+            if not ready or grabber is None:
+                return False, None
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ret, frame = grabber.read(remaining)
+            if ret:
+                self.timestamp = grabber.timestamp
+                return ret, frame
+            if grabber.running:
+                return False, None
+            ended = grabber
+
+    def is_running(self):
+        return not self._stop.is_set()
+
+    @property
+    def frames(self):
+        with self._cond:
+            return self._frames + (self._grabber.frames if self._grabber is not None else 0)
+
+    @property
+    def dropped(self):
+        with self._cond:
+            return self._dropped + (self._grabber.dropped if self._grabber is not None else 0)
+
+    def stop(self, timeout=2):
+        self._stop.set()
+        with self._cond:
+            grabber = self._grabber
+            self._cond.notify_all()
+        if grabber is not None:
+            self._interrupt(grabber)
+            grabber.stop(timeout=0)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+
+def probe(url, timeout=10.0, opener=open_capture):
+    """Return True if ``url`` delivers a frame within ``timeout`` seconds."""
+    supervisor = StreamSupervisor(url, opener, connect_timeout=timeout).start()
+    try:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            ret, _ = supervisor.read(timeout=deadline - time.monotonic())
+            if ret:
+                return True
+        return False
+    finally:
+        supervisor.stop()
@@ -0,0 +1,143 @@
+import numpy as np
+
+ACTIVATIONS = {
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+    "hard_sigmoid": lambda x: np.clip(0.2 * x + 0.5, 0.0, 1.0),
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "linear": lambda x: x,
+}
+
+
+def softmax(x):
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+
+class StreamingLSTM:
+    """One-step-at-a-time NumPy copy of the trained LSTM stack.
+
+    The weights of the Keras model (stacked LSTM layers, Dropout, a softmax
+    Dense head) are copied into plain arrays. ``step`` advances a caller-owned
+    hidden state by one frame, so a prediction costs O(1) instead of
+    re-running the recurrence over the whole window. Dropout is a no-op at
+    inference time and is skipped.
+    """
+
+    def __init__(self, lstm_layers, dense):
+        # lstm_layers: [(kernel, recurrent_kernel, bias, activation, recurrent_activation), ...]
+        self.lstm_layers = [
+            (kernel.astype(np.float32), recurrent.astype(np.float32), bias.astype(np.float32),
+             ACTIVATIONS[activation], ACTIVATIONS[recurrent_activation])
+            for kernel, recurrent, bias, activation, recurrent_activation in lstm_layers
+        ]
+        kernel, bias, activation = dense
+        self.dense = (kernel.astype(np.float32), bias.astype(np.float32), activation)
+
+    @classmethod
+    def from_keras(cls, model):
+        lstm_layers = []
+        dense = None
+        for layer in model.layers:
+            name = layer.__class__.__name__
+            config = layer.get_config()
+            if name == "LSTM":
+                kernel, recurrent, bias = layer.get_weights()
+                lstm_layers.append((kernel, recurrent, bias, config["activation"], config["recurrent_activation"]))
+            elif name == "Dense":
+                kernel, bias = layer.get_weights()
+                dense = (kernel, bias, config["activation"])
+            elif name not in ("Dropout", "InputLayer"):
+                raise ValueError(f"Unsupported layer for streaming inference: {name}")
+        if not lstm_layers or dense is None:
+            raise ValueError("Model must be a stack of LSTM layers followed by a Dense head")
+        return cls(lstm_layers, dense)
+
+    def initial_state(self):
+        return [(np.zeros(recurrent.shape[0], dtype=np.float32), np.zeros(recurrent.shape[0], dtype=np.float32))
+                for _, recurrent, _, _, _ in self.lstm_layers]
+
+    def _head(self, h):
+        kernel, bias, activation = self.dense
+        logits = h @ kernel + bias
+        return softmax(logits) if activation == "softmax" else ACTIVATIONS[activation](logits)
+
+    def step(self, x, state):
+        """Advance ``state`` in place by one ``(num_features,)`` frame and return class probabilities."""
+        h_in = np.asarray(x, dtype=np.float32)
+        for i, (kernel, recurrent, bias, activation, recurrent_activation) in enumerate(self.lstm_layers):
+            h, c = state[i]
+            units = recurrent.shape[0]
+            z = h_in @ kernel + h @ recurrent + bias
+            gate_i = recurrent_activation(z[:units])
+            gate_f = recurrent_activation(z[units:2 * units])
+            gate_c = activation(z[2 * units:3 * units])
+            gate_o = recurrent_activation(z[3 * units:])
+            c = gate_f * c + gate_i * gate_c
+            h = gate_o * activation(c)
+            state[i] = (h, c)
+            h_in = h
+        return self._head(h_in)
+
+    def run(self, window):
+        """Run a full ``(T, num_features)`` window from a zero state.
+
+        Returns ``(probabilities, state)``; the result matches the Keras model
+        on the same window and the state can be used to continue streaming.
+        """
+        xs = np.asarray(window, dtype=np.float32)
+        state = []
+        for kernel, recurrent, bias, activation, recurrent_activation in self.lstm_layers:
+            units = recurrent.shape[0]
+            projected = xs @ kernel + bias
+            h = np.zeros(units, dtype=np.float32)
+            c = np.zeros(units, dtype=np.float32)
+            outputs = np.empty((len(xs), units), dtype=np.float32)
+            for t in range(len(xs)):
+                z = projected[t] + h @ recurrent
+                gate_i = recurrent_activation(z[:units])
+                gate_f = recurrent_activation(z[units:2 * units])
+                gate_c = activation(z[2 * units:3 * units])
+                gate_o = recurrent_activation(z[3 * units:])
+                c = gate_f * c + gate_i * gate_c
+                h = gate_o * activation(c)
+                outputs[t] = h
+            state.append((h, c))
+            xs = outputs
+        return self._head(xs[-1]), state
+
+
+class StreamingClassifier:
+    """Per-stream hidden state over a shared ``StreamingLSTM``.
+
+    Each frame costs one ``step``. Because the streamed state keeps history
+    beyond the training window, every ``resync_every`` frames the state is
+    rebuilt from the current window so the output cannot drift far from the
+    full-window prediction.
+    """
+
+    def __init__(self, network, window_length=100, resync_every=100):
+        self.network = network
+        self.window_length = window_length
+        self.resync_every = resync_every
+        self.reset()
+
+    def reset(self):
+        self.state = self.network.initial_state()
+        self.frames = 0
+        self._since_resync = 0
+
+    def update(self, landmarks, window=None):
+        """Feed one frame and return the class probabilities.
+
+        ``window`` is the ``(T, num_features)`` window ending with this frame;
+        it is only read when a resync is due.
+        """
+        self.frames += 1
+        self._since_resync += 1
+        if (window is not None and self.frames > self.window_length
+                and self._since_resync >= self.resync_every):
+            self._since_resync = 0
+            probabilities, self.state = self.network.run(window)
+            return probabilities
+        return self.network.step(landmarks, self.state)